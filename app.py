@@ -1,17 +1,17 @@
 import streamlit as st
-import pandas as pd
-import plotly.graph_objects as go
 from datetime import date, timedelta
 from supabase import create_client
 import time
-from streamlit_option_menu import option_menu
 import os
-from PIL import Image
-import io
 import unicodedata
+import html
+from assets import TRANS, BASE_CSS, APP_CSS
+# pandas/numpy, option_menu and data.py are imported when the dashboard renders, Plotly (charts.py)
+# and PIL (images.py) by the tab or upload that needs them: the login screen loads none of them.
 
 # --- CONFIG ---
 st.set_page_config(page_title="PatiCheck", page_icon="🐾", layout="centered")
+URGENT_PAGE_SIZE = 10  # Home urgent list: cards per "show more" step
 
 # --- CONNECT TO DB ---
 @st.cache_resource
@@ -28,184 +28,22 @@ supabase = init_supabase()
 # --- TRANSLATION ENGINE ---
 if 'lang' not in st.session_state: st.session_state.lang = 'TR'
 
-TRANS = {
-    "app_slogan": {"TR": "Evcil hayvanlarınızın sağlığı, kontrol altında.", "EN": "Your pets' health, under control."},
-    "intro_card": {
-        "TR": """<div style="background-color: #FFFFFF; border: 1px solid #E2E8F0; border-radius: 12px; padding: 20px; margin-bottom: 20px; text-align: center; color: #4A5568; font-size: 0.9rem; box-shadow: 0 4px 6px -1px rgba(0,0,0,0.05);"><h4 style="margin-top:0; color:#1A202C;">🐶 Hakkında</h4><p style="margin-bottom:15px;">PatiCheck, evcil dostlarınızın aşı ve kilo takibini kolaylaştırmak için kişisel kullanım amacıyla geliştirilmiş <b>ücretsiz ve amatör</b> bir hobi projesidir.</p><div style="display: inline-block; text-align: left;">✅ Aşı Takvimi ve E-posta Hatırlatmaları<br>✅ Kilo Takibi ve Grafikler<br>✅ Pet Fotoğraf Albümü</div></div>""",
-        "EN": """<div style="background-color: #FFFFFF; border: 1px solid #E2E8F0; border-radius: 12px; padding: 20px; margin-bottom: 20px; text-align: center; color: #4A5568; font-size: 0.9rem; box-shadow: 0 4px 6px -1px rgba(0,0,0,0.05);"><h4 style="margin-top:0; color:#1A202C;">🐶 About</h4><p style="margin-bottom:15px;">PatiCheck is a <b>free, amateur</b> hobby project originally developed for personal use to simplify vaccine and weight tracking for your pets.</p><div style="display: inline-block; text-align: left;">✅ Vaccine Schedule & Email Reminders<br>✅ Weight Tracking & Charts<br>✅ Pet Photo Album</div></div>"""
-    },
-    "login_tab": {"TR": "Giriş Yap", "EN": "Login"},
-    "otp_tab": {"TR": "Kayıt / Şifremi Unuttum", "EN": "Register / Forgot Password"},
-    "welcome_header": {"TR": "Hoşgeldiniz", "EN": "Welcome"},
-    "otp_header": {"TR": "Tek Kullanımlık Kod ile Giriş", "EN": "Login with One-Time Code"},
-    "email_label": {"TR": "Email", "EN": "Email"},
-    "password_label": {"TR": "Şifre", "EN": "Password"},
-    "login_btn": {"TR": "Giriş Yap", "EN": "Login"},
-    "send_code": {"TR": "Kod Gönder", "EN": "Send Code"},
-    "verify_btn": {"TR": "Doğrula", "EN": "Verify"},
-    "code_sent": {"TR": "Kod gönderildi:", "EN": "Code sent to:"},
-    "enter_code": {"TR": "6 Haneli Kod", "EN": "6 Digit Code"},
-    "setup_title": {"TR": "Hesap Kurulumu", "EN": "Account Setup"},
-    "setup_intro": {"TR": "Giriş başarılı! Lütfen isminizi ve kalıcı şifrenizi belirleyin.", "EN": "Login successful! Please set your name and permanent password."},
-    "label_name": {"TR": "İsim", "EN": "Name"},
-    "label_new_pass": {"TR": "Yeni Şifre", "EN": "New Password"},
-    "save_setup": {"TR": "Kaydet ve Başla", "EN": "Save & Start"},
-    "error_login": {"TR": "Email veya şifre hatalı.", "EN": "Invalid email or password."},
-    "error_code": {"TR": "Hatalı Kod.", "EN": "Invalid Code."},
-    "email_confirm_error": {"TR": "Lütfen email onaylayın.", "EN": "Please confirm your email."},
-    "success_setup": {"TR": "Hesap oluşturuldu!", "EN": "Account setup complete!"},
-    "fill_all": {"TR": "Lütfen tüm alanları doldurun.", "EN": "Please fill all fields."},
-    "nav_home": {"TR": "Ana Sayfa", "EN": "Home"},
-    "nav_profiles": {"TR": "Profiller", "EN": "Profiles"},
-    "nav_settings": {"TR": "Ayarlar", "EN": "Settings"},
-    "hello": {"TR": "👋 Merhaba", "EN": "👋 Hello"},
-    "add_main_btn": {"TR": "➕ Pet / Aşı Ekle", "EN": "➕ Add Pet / Vaccine"},
-    "empty_home": {"TR": "Hoşgeldiniz! Henüz bir kayıt yok.", "EN": "Welcome! No records found yet."},
-    "metric_total": {"TR": "Toplam Pet", "EN": "Total Pets"},
-    "metric_upcoming": {"TR": "Yaklaşan", "EN": "Upcoming"},
-    "metric_overdue": {"TR": "Gecikmiş", "EN": "Overdue"},
-    "urgent_header": {"TR": "🚨 ACİL DURUMLAR", "EN": "🚨 URGENT ALERTS"},
-    "days_passed": {"TR": "GÜN GEÇTİ", "EN": "DAYS AGO"},
-    "day_passed": {"TR": "GÜN GEÇTİ", "EN": "DAY AGO"},
-    "days_left": {"TR": "GÜN KALDI", "EN": "DAYS LEFT"},
-    "day_left": {"TR": "GÜN KALDI", "EN": "DAY LEFT"},
-    "days_ok": {"TR": "GÜN VAR", "EN": "DAYS LEFT"},
-    "no_urgent": {"TR": "Harika! Önümüzdeki 7 gün içinde acil bir durum yok.", "EN": "Great! No urgent items in the next 7 days."},
-    "add_vac_btn": {"TR": "Aşı Ekle", "EN": "Add Vax"},
-    "quick_update_btn": {"TR": "💉 Güncelle", "EN": "💉 Update"},
-    "details_expander": {"TR": "Detayları Göster", "EN": "Show Details"},
-    "tab_general": {"TR": "Genel", "EN": "General"},
-    "tab_history": {"TR": "Geçmiş", "EN": "History"},
-    "tab_chart": {"TR": "Grafik", "EN": "Chart"},
-    "metric_weight": {"TR": "Kilo", "EN": "Weight"},
-    "metric_next": {"TR": "Sıradaki", "EN": "Next"},
-    "save_changes": {"TR": "Değişiklikleri Kaydet", "EN": "Save Changes"},
-    "success_update": {"TR": "Güncellendi!", "EN": "Updated!"},
-    "upload_label": {"TR": "Fotoğraf Yükle", "EN": "Upload Photo"},
-    "delete_photo": {"TR": "Sil", "EN": "Delete"},
-    "upload_optional": {"TR": "Fotoğraf Ekle (Opsiyonel)", "EN": "Add Photo (Optional)"},
-    "gallery_header": {"TR": "Fotoğraflar", "EN": "Photos"},
-    "gallery_hint": {"TR": "(Max 3 - Değiştirmek için siliniz)", "EN": "(Max 3 - Delete to replace)"},
-    "settings_title": {"TR": "Ayarlar", "EN": "Settings"},
-    "logged_in_as": {"TR": "Giriş:", "EN": "Logged in as:"},
-    "logout_btn": {"TR": "Çıkış Yap", "EN": "Log Out"},
-    "change_pass_exp": {"TR": "Şifre Değiştir", "EN": "Change Password"},
-    "update_btn": {"TR": "Güncelle", "EN": "Update"},
-    "success_pass": {"TR": "Başarılı!", "EN": "Success!"},
-    "dialog_title": {"TR": "💉 Yeni Aşı Kaydı", "EN": "💉 New Vaccine Record"},
-    "label_pet": {"TR": "Evcil Hayvan", "EN": "Pet"},
-    "opt_new_pet": {"TR": "➕ Yeni Pet Ekle...", "EN": "➕ Add New Pet..."},
-    "label_pet_name": {"TR": "Pet İsmi", "EN": "Pet Name"},
-    "ph_pet_name": {"TR": "Örn: Pamuk", "EN": "e.g. Luna"},
-    "label_vac": {"TR": "Aşı / İşlem", "EN": "Vaccine / Treatment"},
-    "label_weight": {"TR": "Kilo (kg)", "EN": "Weight (kg)"},
-    "label_date": {"TR": "Yapılan Tarih", "EN": "Date Applied"},
-    "label_mode": {"TR": "Hesaplama", "EN": "Calculation"},
-    "opt_auto": {"TR": "Otomatik", "EN": "Automatic"},
-    "opt_manual": {"TR": "Manuel", "EN": "Manual"},
-    "label_validity": {"TR": "Geçerlilik", "EN": "Validity"},
-    "pill_1m": {"TR": "1 Ay", "EN": "1 Mo"},
-    "pill_2m": {"TR": "2 Ay", "EN": "2 Mo"},
-    "pill_3m": {"TR": "3 Ay", "EN": "3 Mo"},
-    "pill_1y": {"TR": "1 Yıl", "EN": "1 Yr"},
-    "label_due_date": {"TR": "Bitiş Tarihi", "EN": "Due Date"},
-    "caption_next": {"TR": "📅 Bir Sonraki Tarih:", "EN": "📅 Next Due Date:"},
-    "label_notes": {"TR": "Notlar", "EN": "Notes"},
-    "ph_notes": {"TR": "Veteriner adı...", "EN": "Vet name..."},
-    "save_btn": {"TR": "Kaydet", "EN": "Save"},
-    "warn_name": {"TR": "Lütfen bir isim girin.", "EN": "Please enter a name."},
-    "warn_date": {"TR": "Lütfen geçerlilik süresini (veya tarihini) seçin.", "EN": "Please select validity or due date."},
-    "success_save": {"TR": "Kaydedildi!", "EN": "Saved!"},
-    "vac_karma": {"TR": "Karma", "EN": "Mixed (Karma)"},
-    "vac_rabies": {"TR": "Kuduz", "EN": "Rabies"},
-    "vac_leukemia": {"TR": "Lösemi", "EN": "Leukemia"},
-    "vac_internal": {"TR": "İç Parazit", "EN": "Internal Parasite"},
-    "vac_external": {"TR": "Dış Parazit", "EN": "External Parasite"},
-    "vac_kc": {"TR": "Bronşin (KC)", "EN": "Kennel Cough"},
-    "vac_lyme": {"TR": "Lyme", "EN": "Lyme"},
-    "vac_checkup": {"TR": "Check-up", "EN": "Check-up"},
-    "col_vac": {"TR": "Aşı", "EN": "Vaccine"},
-    "col_applied": {"TR": "Yapıldı", "EN": "Applied"},
-    "col_due": {"TR": "Bitiş", "EN": "Due"},
-    "col_weight": {"TR": "Kg", "EN": "Kg"},
-    "col_note": {"TR": "Not", "EN": "Note"},
-    "sec_email_label": {"TR": "İkincil Email (Eş/Partner)", "EN": "Secondary Email (Partner)"},
-    "sec_email_hint": {"TR": "Aşı bildirimleri bu adrese de gönderilecektir.", "EN": "Vaccine alerts will also be sent here."},
-}
-
 def T(key):
     lang = st.session_state.lang
     return TRANS.get(key, {}).get(lang, key)
 
-# --- CSS: DIAMOND GRADE FIX ---
-st.markdown("""
-<style>
-    @import url('https://fonts.googleapis.com/css2?family=Inter:wght@400;500;700&display=swap');
-    :root { color-scheme: light !important; }
-    html, body, [class*="css"] { font-family: 'Inter', sans-serif; background-color: #F8F9FA !important; color: #1A202C !important; }
-    .stApp { background-color: #F8F9FA !important; }
-    
-    div[data-testid="stDialog"] > div { background-color: #FFFFFF !important; color: #1A202C !important; }
-    button[aria-label="Close"] { color: #1A202C !important; background-color: transparent !important; border: none !important; }
-    .stTextInput input, .stNumberInput input, .stDateInput input, .stTextArea textarea { background-color: #FFFFFF !important; color: #1A202C !important; border: 1px solid #E2E8F0 !important; }
-    input[type="password"] { background-color: #FFFFFF !important; color: #1A202C !important; -webkit-text-fill-color: #1A202C !important; }
-    
-    div[data-baseweb="select"] { background-color: #FFFFFF !important; }
-    div[data-baseweb="select"] > div { background-color: #FFFFFF !important; color: #1A202C !important; border-color: #E2E8F0 !important; }
-    div[data-baseweb="select"] span { color: #1A202C !important; }
-    div[data-baseweb="popover"], div[data-baseweb="menu"], ul[role="listbox"] { background-color: #FFFFFF !important; border: 1px solid #E2E8F0 !important; }
-    li[role="option"] { color: #2D3748 !important; background-color: #FFFFFF !important; }
-    li[role="option"]:hover { background-color: #FFF5F5 !important; color: #FF6B6B !important; }
-    
-    div[data-baseweb="tag"] { background-color: #F1F3F5 !important; border: 1px solid #E2E8F0 !important; }
-    div[data-baseweb="tag"] span { color: #4A5568 !important; }
-    div[data-baseweb="tag"][aria-selected="true"] { background-color: #FF6B6B !important; }
-    div[data-baseweb="tag"][aria-selected="true"] span { color: #FFFFFF !important; }
-    input[type="date"] { color-scheme: light !important; }
-
-    div.css-card { 
-        background-color: #FFFFFF; 
-        border: 1px solid #E2E8F0; 
-        border-radius: 16px; 
-        padding: 20px; 
-        box-shadow: 0 4px 6px -1px rgba(0,0,0,0.05);
-        margin-bottom: 24px; /* Added spacing between cards */
-    }
-    
-    div.stButton > button { width: 100%; border-radius: 12px; height: 48px; background-color: #FFFFFF !important; color: #2D3748 !important; border: 2px solid #E2E8F0 !important; font-weight: 700; box-shadow: none !important; }
-    div.stButton > button:hover { border-color: #FF6B6B !important; color: #FF6B6B !important; background-color: #FFF5F5 !important; }
-    div.stButton > button[kind="primary"] { background-color: #FF6B6B !important; color: white !important; border: none !important; box-shadow: 0 4px 6px rgba(255,107,107,0.25) !important; }
-    div.stButton > button[kind="primary"]:hover { background-color: #FA5252 !important; transform: scale(1.01); color: white !important; }
-    
-    /* Specific styling for small buttons inside cards */
-    button[kind="secondary"] { height: 38px !important; }
-
-    .stTabs [data-baseweb="tab-list"] { gap: 8px; border-bottom: none; margin-bottom: 20px; }
-    .stTabs [data-baseweb="tab"] { height: 40px; background-color: #FFFFFF; border-radius: 20px; color: #718096; border: 1px solid #E2E8F0; font-weight: 600; flex: 1 1 auto; }
-    .stTabs [aria-selected="true"] { background-color: #FF6B6B; color: white !important; border: none; }
-    .streamlit-expanderHeader { background-color: #FFFFFF !important; border: 2px solid #E2E8F0 !important; border-radius: 12px !important; color: #1A202C !important; }
-    div[data-testid="stExpander"] { border: none; box-shadow: none; }
-    [data-testid="stMetricValue"] { color: #1A202C !important; }
-    [data-testid="stMetricLabel"] { color: #718096 !important; }
-    [data-testid="stSidebar"], footer, #MainMenu { display: none; }
-    div[data-testid="InputInstructions"] { display: none !important; }
-    .js-plotly-plot .plotly .main-svg { background-color: transparent !important; }
-    [data-testid="stDataFrame"] { background-color: white !important; border: 1px solid #E2E8F0; }
-
-    @media only screen and (max-width: 600px) {
-        .nav-link { font-size: 12px !important; padding: 5px 2px !important; white-space: nowrap !important; }
-        div[data-testid="column"] button { width: 100% !important; margin-top: 10px !important; }
-        div[role="dialog"] { width: 95vw !important; }
-    }
-</style>
-""", unsafe_allow_html=True)
+# --- CSS (assets.py) ---
+st.markdown(BASE_CSS, unsafe_allow_html=True)
 
 # --- STATE ---
 if "user" not in st.session_state: st.session_state["user"] = None
 if "otp_sent" not in st.session_state: st.session_state["otp_sent"] = False
 if "otp_email_cache" not in st.session_state: st.session_state["otp_email_cache"] = ""
 if "show_onboarding" not in st.session_state: st.session_state["show_onboarding"] = False
-if "processed_files" not in st.session_state: st.session_state["processed_files"] = []
+if "uploader_round" not in st.session_state: st.session_state["uploader_round"] = 0
+if "uploads" not in st.session_state: st.session_state["uploads"] = []
+if "open_pet" not in st.session_state: st.session_state["open_pet"] = None
+if "urgent_shown" not in st.session_state: st.session_state["urgent_shown"] = URGENT_PAGE_SIZE
 
 if not supabase:
     st.error("Sistem Hatası: Veritabanı bağlantısı kurulamadı.")
@@ -219,28 +57,67 @@ def render_header():
     st.markdown("""<h1 style='text-align: center; color: #1A202C !important; font-size: 3.5rem; letter-spacing: -2px; margin-bottom: 0;'>Pati<span style='color:#FF6B6B'>*</span>Check</h1><p style='text-align: center; font-size: 0.9rem; color: #A0AEC0 !important; font-style: italic; margin-top: -10px; margin-bottom: 20px;'>* Pati means 'Paw' in Turkish</p>""", unsafe_allow_html=True)
 
 # --- HELPER: NAME ---
-def get_user_name():
+def get_user_name(profile=None):
     if st.session_state["user"]:
         meta = st.session_state["user"].user_metadata
         if meta and "full_name" in meta: return meta["full_name"]
-        try:
-            res = supabase.table("profiles").select("full_name").eq("id", st.session_state["user"].id).execute()
-            if res.data and res.data[0]['full_name']: return res.data[0]['full_name']
-        except: pass
+        if profile and profile.get('full_name'): return profile['full_name']
         return st.session_state["user"].email.split("@")[0]
     return ""
 
 # --- HELPER: CROP & SANITIZE ---
-def crop_to_square(image):
-    width, height = image.size
-    new_size = min(width, height)
-    left, top = (width - new_size)/2, (height - new_size)/2
-    return image.crop((left, top, left + new_size, top + new_size))
-
 def sanitize_key(text):
     text = unicodedata.normalize('NFKD', text).encode('ascii', 'ignore').decode('utf-8')
     return text.strip().replace(" ", "_")
 
+# Runs on the background upload pool (images.submit): no st.* calls in here.
+# Photos are keyed on the hash of the normalized image (sql/010): a picture the pet's gallery already
+# has is dropped before any encoding or storage write, whichever device or file name it came from.
+def save_photo(user_id, pet_name, data):
+    from images import normalize, content_hash, encode, photo_paths, upload
+    display = normalize(data); digest = content_hash(display)
+    if supabase.table("pet_photos").select("id").eq("user_id", user_id).eq("pet_name", pet_name).eq("content_hash", digest).limit(1).execute().data: return
+    photo, thumb = encode(display)
+    path, thumb_path = photo_paths(user_id, sanitize_key(pet_name), digest)
+    url = upload(supabase, path, photo, upsert=True, immutable=True); thumb_url = upload(supabase, thumb_path, thumb, upsert=True, immutable=True)
+    supabase.table("pet_photos").upsert({"user_id": user_id, "pet_name": pet_name, "photo_url": url, "thumb_url": thumb_url, "content_hash": digest}, on_conflict="user_id,pet_name,content_hash", ignore_duplicates=True).execute()
+    invalidate(user_id)
+
+# Pages show thumbnails; rows not backfilled yet (backfill_thumbnails.py) fall back to the original.
+def thumb_of(photo):
+    url = photo.get("thumb_url")
+    return url if isinstance(url, str) and url else photo["photo_url"]
+
+def toggle_pet(pet):
+    st.session_state["open_pet"] = None if st.session_state["open_pet"] == pet else pet
+
+# --- URGENT LIST ---
+# Status bucket, day count and colours for every row in one vectorized pass, rendered as a single
+# HTML block (one element no matter how many items are overdue).
+URGENT_COLORS = [("#FFF5F5", "#C53030"), ("#FFFAF0", "#C05621"), ("#F0FFF4", "#2F855A")]
+
+def urgent_cards_html(urgent, today):
+    due = pd.to_datetime(urgent["next_due_date"]); days = (due - pd.Timestamp(today)).dt.days.to_numpy()
+    colors = np.array(URGENT_COLORS)[np.select([days < 0, days <= 3], [0, 1], 2)]
+    units = np.where(days < 0, np.where(days == -1, T('day_passed'), T('days_passed')), np.where(days == 1, T('day_left'), np.where(days <= 3, T('days_left'), T('days_ok'))))
+    return "".join(
+        f'<div style="background-color: {bg}; border: 1px solid {fg}30; padding: 15px; border-radius: 12px; margin-bottom: 10px; display: flex; justify-content: space-between; align-items: center;">'
+        f'<div><div style="color: #1A202C; font-weight: bold; font-size: 16px;">{html.escape(str(pet))}</div><div style="color: #4A5568; font-size: 14px;">{html.escape(str(vac))}</div></div>'
+        f'<div style="text-align: right;"><div style="color: {fg}; font-weight: 800; font-size: 13px;">{n} {unit}</div><div style="color: #718096; font-size: 12px;">{d}</div></div></div>'
+        for pet, vac, (bg, fg), n, unit, d in zip(urgent["pet_name"], urgent["vaccine_type"], colors, np.abs(days), units, due.dt.strftime('%d.%m.%Y')))
+
+def show_more_urgent():
+    st.session_state["urgent_shown"] += URGENT_PAGE_SIZE
+
+# Polls the session's pending uploads and reruns the page once they have all landed.
+@st.fragment(run_every=1)
+def upload_status():
+    pending = st.session_state["uploads"]
+    if all(f.done() for f in pending):
+        st.session_state["upload_errors"] = [str(f.exception()) for f in pending if f.exception()]
+        st.session_state["uploads"] = []; st.rerun()
+    else: st.caption(T("photo_uploading"))
+
 # --- DIALOGS ---
 @st.dialog("Dialog") 
 def add_vaccine_dialog(existing_pets, default_pet=None, default_vac=None):
@@ -265,10 +142,11 @@ def add_vaccine_dialog(existing_pets, default_pet=None, default_vac=None):
     default_w = 0.0
     if sel != T("opt_new_pet"):
         try:
-            # Query last weight
-            rows = supabase.table("vaccinations").select("weight").eq("user_id", st.session_state["user"].id).eq("pet_name", sel).order("date_applied", desc=True).limit(1).execute()
-            if rows.data:
-                default_w = float(rows.data[0]['weight'])
+            # Last weight from the cached bootstrap payload (no extra query)
+            vdf = load_bootstrap(supabase, st.session_state["user"].id)["vaccinations"]
+            rows = vdf[vdf["pet_name"] == sel].sort_values("date_applied", ascending=False)
+            if not rows.empty:
+                default_w = float(rows.iloc[0]['weight'])
         except:
             pass
 
@@ -308,22 +186,19 @@ def add_vaccine_dialog(existing_pets, default_pet=None, default_vac=None):
             try:
                 # 1. Photo Upload
                 if photo_file:
-                    try:
-                        img = crop_to_square(Image.open(photo_file))
-                        buf = io.BytesIO()
-                        img.save(buf, format="JPEG", quality=80)
-                        safe_pet = sanitize_key(final_pet_name)
-                        path = f"{st.session_state['user'].id}/{safe_pet}/{int(time.time())}.jpg"
-                        supabase.storage.from_("pet-photos").upload(path, buf.getvalue(), {"content-type": "image/jpeg"})
-                        public_url = supabase.storage.from_("pet-photos").get_public_url(path)
-                        supabase.table("pet_photos").insert({"user_id": st.session_state['user'].id, "pet_name": final_pet_name, "photo_url": public_url}).execute()
-                    except Exception as e: st.error(f"Foto Hatası: {e}")
+                    from images import submit
+                    st.session_state["uploads"].append(submit(save_photo, st.session_state['user'].id, final_pet_name, photo_file.getvalue()))
 
                 # 2. Save Vaccine
                 supabase.table("vaccinations").insert({"user_id": st.session_state["user"].id, "pet_name": final_pet_name, "vaccine_type": vac, "date_applied": str(d1), "next_due_date": str(d2), "weight": w, "notes": notes}).execute()
+                invalidate(st.session_state["user"].id, final_pet_name)
                 st.success(T("success_save")); time.sleep(0.5); st.rerun()
             except Exception as e: st.error(f"Hata: {e}")
 
+@st.dialog("Dialog3", width="large")
+def photo_dialog(url):
+    st.image(url, use_container_width=True)
+
 @st.dialog("Dialog2")
 def onboarding_dialog():
     st.markdown(f"### {T('setup_title')}")
@@ -332,7 +207,7 @@ def onboarding_dialog():
     new_pass = st.text_input(T('label_new_pass'), type="password")
     if st.button(T('save_setup'), type="primary"):
         if name and new_pass:
-            try: supabase.auth.update_user({"password": new_pass}); supabase.table("profiles").upsert({"id": st.session_state["user"].id, "email": st.session_state["user"].email, "full_name": name}).execute(); st.success(T('success_setup')); st.session_state["show_onboarding"] = False; time.sleep(1); st.rerun()
+            try: supabase.auth.update_user({"password": new_pass}); supabase.table("profiles").upsert({"id": st.session_state["user"].id, "email": st.session_state["user"].email, "full_name": name}).execute(); invalidate(st.session_state["user"].id); st.success(T('success_setup')); st.session_state["show_onboarding"] = False; time.sleep(1); st.rerun()
             except Exception as e: st.error(str(e))
         else: st.warning(T('fill_all'))
 
@@ -381,13 +256,20 @@ if st.session_state["user"] is None:
         st.markdown('</div>', unsafe_allow_html=True)
 
 else:
+    import numpy as np
+    import pandas as pd
+    from streamlit_option_menu import option_menu
+    from data import load_bootstrap, load_history, load_calendar_token, invalidate, diff_records, HOME_COLUMNS
+    st.markdown(APP_CSS, unsafe_allow_html=True)
     if st.session_state.get("show_onboarding"): onboarding_dialog()
     render_header()
+    if st.session_state["uploads"]: upload_status()
+    for e in st.session_state.pop("upload_errors", []): st.error(f"Foto Hatası: {e}")
     selected = option_menu(None, [T("nav_home"), T("nav_profiles"), T("nav_settings")], icons=["house-fill", "heart-fill", "gear-fill"], default_index=0, orientation="horizontal", styles={"container": {"padding": "0!important", "background-color": "#FFFFFF", "border-radius": "12px", "border": "1px solid #E2E8F0", "box-shadow": "0 2px 4px rgba(0,0,0,0.02)"}, "nav-link": {"font-size": "14px", "text-align": "center", "margin": "0px", "color": "#718096"}, "nav-link-selected": {"background-color": "#FF6B6B", "color": "white", "font-weight": "600"}})
-    rows = supabase.table("vaccinations").select("*").execute().data; df = pd.DataFrame(rows)
+    boot = load_bootstrap(supabase, st.session_state["user"].id); df = boot["vaccinations"]
 
     if selected == T("nav_home"):
-        c1, c2 = st.columns([2.5, 1.2]); c1.subheader(f"{T('hello')} {get_user_name()}")
+        c1, c2 = st.columns([2.5, 1.2]); c1.subheader(f"{T('hello')} {get_user_name(boot['profile'])}")
         
         # Add Pet Button
         existing_pets = list(df["pet_name"].unique()) if not df.empty else []
@@ -396,17 +278,15 @@ else:
 
         if df.empty: st.info(T("empty_home"))
         else:
-            df["next_due_date"] = pd.to_datetime(df["next_due_date"]).dt.date
             today = date.today()
             
-            # --- SMART LOGIC: Get latest status per pet/vaccine ---
-            df_sorted = df.sort_values("date_applied", ascending=False)
-            latest_status = df_sorted.drop_duplicates(subset=["pet_name", "vaccine_type"], keep="first")
+            # --- SMART LOGIC: latest status per pet/vaccine, maintained by the database (vaccination_latest) ---
+            latest_status = boot["latest"][HOME_COLUMNS].assign(next_due_date=lambda l: pd.to_datetime(l["next_due_date"]).dt.date)
             
             # Metrics
             k1, k2, k3 = st.columns(3)
             def styled_metric(label, value, color="#1A202C"): st.markdown(f"""<div style="background:white; padding:15px; border-radius:12px; border:1px solid #E2E8F0; text-align:center; box-shadow: 0 1px 3px rgba(0,0,0,0.05);"><div style="color:#718096; font-size:12px; font-weight:700; margin-bottom:5px; text-transform:uppercase;">{label}</div><div style="color:{color}; font-size:26px; font-weight:800;">{value}</div></div>""", unsafe_allow_html=True)
-            with k1: styled_metric(T("metric_total"), df['pet_name'].nunique())
+            with k1: styled_metric(T("metric_total"), latest_status['pet_name'].nunique())
             
             # Filter latest status for upcoming/overdue
             upcoming = latest_status[latest_status["next_due_date"] > today]
@@ -422,101 +302,93 @@ else:
             
             if not urgent.empty:
                 st.caption(T("urgent_header"))
-                for _, row in urgent.iterrows():
-                    days = (row['next_due_date'] - today).days
-                    if days < 0:
-                        colors = ("#FFF5F5", "#C53030"); msg = f"{abs(days)} {T('day_passed') if abs(days)==1 else T('days_passed')}"
-                    elif days <= 3:
-                        colors = ("#FFFAF0", "#C05621"); msg = f"{days} {T('day_left') if days==1 else T('days_left')}"
-                    else:
-                        colors = ("#F0FFF4", "#2F855A"); msg = f"{days} {T('day_left') if days==1 else T('days_ok')}"
-                    
-                    # Alert Card
-                    st.markdown(f"""
-                    <div style="background-color: {colors[0]}; border: 1px solid {colors[1]}30; padding: 15px; border-radius: 12px; margin-bottom: 10px; display: flex; justify-content: space-between; align-items: center;">
-                        <div>
-                            <div style="color: #1A202C; font-weight: bold; font-size: 16px;">{row['pet_name']}</div>
-                            <div style="color: #4A5568; font-size: 14px;">{row['vaccine_type']}</div>
-                        </div>
-                        <div style="text-align: right;">
-                            <div style="color: {colors[1]}; font-weight: 800; font-size: 13px;">{msg}</div>
-                            <div style="color: #718096; font-size: 12px;">{row['next_due_date'].strftime('%d.%m.%Y')}</div>
-                        </div>
-                    </div>
-                    """, unsafe_allow_html=True)
-                    
-                    # Quick Update Button (Outside HTML, inside Streamlit layout)
-                    # We use columns to right-align it slightly
-                    b1, b2 = st.columns([4, 1])
-                    with b2:
-                        if st.button(T("quick_update_btn"), key=f"upd_{row['id']}", type="secondary"):
-                            add_vaccine_dialog(existing_pets, default_pet=row['pet_name'], default_vac=row['vaccine_type'])
-                    st.write("") # Spacer
+                # All cards in one markdown block, one page at a time
+                shown = st.session_state["urgent_shown"]
+                st.markdown(urgent_cards_html(urgent.iloc[:shown], today), unsafe_allow_html=True)
+                if len(urgent) > shown: st.button(f"{T('show_more')} ({len(urgent) - shown})", on_click=show_more_urgent, type="secondary")
+
+                # One quick-update picker instead of a button per card
+                q1, q2 = st.columns([4, 1.2])
+                labels = [f"{p} · {v}" for p, v in zip(urgent["pet_name"], urgent["vaccine_type"])]
+                pick = q1.selectbox(T("quick_update_pick"), range(len(urgent)), format_func=labels.__getitem__, label_visibility="collapsed")
+                if q2.button(T("quick_update_btn"), type="secondary"):
+                    add_vaccine_dialog(existing_pets, default_pet=urgent.iloc[pick]['pet_name'], default_vac=urgent.iloc[pick]['vaccine_type'])
             else: st.success(T("no_urgent"))
 
     elif selected == T("nav_profiles"):
         if df.empty: st.warning(T("empty_home"))
         else:
             df["next_due_date"] = pd.to_datetime(df["next_due_date"]).dt.date; df["date_applied"] = pd.to_datetime(df["date_applied"]).dt.date; pets = df["pet_name"].unique()
-            try: photos_res = supabase.table("pet_photos").select("*").eq("user_id", st.session_state["user"].id).execute(); photos_df = pd.DataFrame(photos_res.data)
-            except: photos_df = pd.DataFrame()
+            latest = boot["latest"].assign(next_due_date=lambda l: pd.to_datetime(l["next_due_date"]).dt.date)
+            # Group once per rerun instead of filtering the whole frame for every pet
+            vax_by_pet = dict(tuple(df.sort_values("date_applied").groupby("pet_name", sort=False)))
+            photos_by_pet = dict(tuple(boot["photos"].sort_values("created_at", ascending=False).groupby("pet_name", sort=False)))
+            latest_by_pet = dict(tuple(latest.groupby("pet_name", sort=False)))
             for pet in pets:
-                p_df = df[df["pet_name"] == pet].sort_values("date_applied"); p_photos = photos_df[photos_df["pet_name"] == pet].sort_values("created_at", ascending=False) if not photos_df.empty else pd.DataFrame()
+                p_df = vax_by_pet[pet]; p_photos = photos_by_pet.get(pet, boot["photos"].iloc[:0])
                 
                 st.markdown('<div class="css-card">', unsafe_allow_html=True)
                 c1, c2 = st.columns([2.5, 1.2])
                 with c1:
                     if not p_photos.empty:
                         a1, a2 = st.columns([1, 4])
-                        with a1: st.image(p_photos.iloc[0]["photo_url"], use_container_width=True)
+                        with a1: st.image(thumb_of(p_photos.iloc[0]), use_container_width=True)
                         with a2: st.subheader(pet)
                     else: st.subheader(f"🐾 {pet}")
                 if c2.button(T("add_vac_btn"), key=f"btn_{pet}", type="secondary"): add_vaccine_dialog(list(pets), default_pet=pet)
                 
-                with st.expander(T("details_expander"), expanded=False):
-                    t1, t2, t3 = st.tabs([T("tab_general"), T("tab_history"), T("tab_chart")])
-                    with t1:
-                        col_a, col_b = st.columns(2)
-                        last_w = p_df.iloc[-1]['weight'] if 'weight' in p_df.columns else 0.0
-                        col_a.metric(T("metric_weight"), f"{last_w} kg")
+                # Details (general tab, history editor, chart) are built only for the opened pet.
+                is_open = st.session_state["open_pet"] == pet
+                st.button(T("hide_details") if is_open else T("details_expander"), key=f"open_{pet}", on_click=toggle_pet, args=(pet,), type="secondary")
+                if is_open:
+                    with st.container(border=True):
+                        t1, t2, t3 = st.tabs([T("tab_general"), T("tab_history"), T("tab_chart")])
+                        with t1:
+                            col_a, col_b = st.columns(2)
+                            last_w = p_df.iloc[-1]['weight'] if 'weight' in p_df.columns else 0.0
+                            col_a.metric(T("metric_weight"), f"{last_w} kg")
                         
-                        # Fix: General tab also needs smart logic
-                        future_vax = p_df[p_df["next_due_date"] >= date.today()].sort_values("next_due_date")
-                        if not future_vax.empty:
-                            nxt = future_vax.iloc[0]
-                            col_b.metric(T("metric_next"), nxt['vaccine_type'], nxt['next_due_date'].strftime('%d.%m'))
-                        else: col_b.metric(T("metric_next"), "-")
+                            # Fix: General tab also needs smart logic
+                            p_latest = latest_by_pet.get(pet, latest.iloc[:0]); future_vax = p_latest[p_latest["next_due_date"] >= date.today()].sort_values("next_due_date")
+                            if not future_vax.empty:
+                                nxt = future_vax.iloc[0]
+                                col_b.metric(T("metric_next"), nxt['vaccine_type'], nxt['next_due_date'].strftime('%d.%m'))
+                            else: col_b.metric(T("metric_next"), "-")
                         
-                        st.write("---")
-                        st.markdown(f"**{T('gallery_header')}** &nbsp;<small style='color:#718096; font-weight:400'>{T('gallery_hint')}</small>", unsafe_allow_html=True)
-                        if not p_photos.empty:
-                            cols = st.columns(3)
-                            for i, (_, ph) in enumerate(p_photos.iterrows()):
-                                with cols[i % 3]:
-                                    st.image(ph["photo_url"], use_container_width=True)
-                                    if st.button("🗑️", key=f"del_{ph['id']}", help=T("delete_photo"), type="secondary"):
-                                        supabase.table("pet_photos").delete().eq("id", ph["id"]).execute(); st.rerun()
-                        if len(p_photos) < 3:
-                            up = st.file_uploader(T("upload_label"), type=['png', 'jpg'], key=f"gal_{pet}")
-                            if up:
-                                file_id = f"{pet}_{up.name}_{up.size}"
-                                if file_id not in st.session_state.processed_files:
+                            st.write("---")
+                            st.markdown(f"**{T('gallery_header')}** &nbsp;<small style='color:#718096; font-weight:400'>{T('gallery_hint')}</small>", unsafe_allow_html=True)
+                            if not p_photos.empty:
+                                cols = st.columns(3)
+                                for i, (_, ph) in enumerate(p_photos.iterrows()):
+                                    with cols[i % 3]:
+                                        st.image(thumb_of(ph), use_container_width=True)
+                                        b1, b2 = st.columns(2)
+                                        if b1.button("🔍", key=f"view_{ph['id']}", help=T("view_photo"), type="secondary"): photo_dialog(ph["photo_url"])
+                                        if b2.button("🗑️", key=f"del_{ph['id']}", help=T("delete_photo"), type="secondary"):
+                                            supabase.table("pet_photos").delete().eq("id", ph["id"]).execute(); invalidate(st.session_state["user"].id); st.rerun()
+                            if len(p_photos) < 3:
+                                # A fresh uploader key after each submit, so the file isn't sent again on the next rerun
+                                up = st.file_uploader(T("upload_label"), type=['png', 'jpg'], key=f"gal_{pet}_{st.session_state['uploader_round']}")
+                                if up:
+                                    from images import submit
+                                    st.session_state["uploads"].append(submit(save_photo, st.session_state['user'].id, pet, up.getvalue())); st.session_state["uploader_round"] += 1; st.rerun()
+                        with t2:
+                            edit_df = load_history(supabase, st.session_state["user"].id, pet).assign(date_applied=lambda h: pd.to_datetime(h["date_applied"]).dt.date, next_due_date=lambda h: pd.to_datetime(h["next_due_date"]).dt.date); edited = st.data_editor(edit_df, column_config={"id": None, "pet_name": None, "vaccine_type": T("col_vac"), "date_applied": st.column_config.DateColumn(T("col_applied"), format="DD.MM.YYYY"), "next_due_date": st.column_config.DateColumn(T("col_due"), format="DD.MM.YYYY"), "weight": st.column_config.NumberColumn(T("col_weight"), format="%.1f"), "notes": T("col_note")}, hide_index=True, use_container_width=True, num_rows="dynamic", key=f"editor_{pet}")
+                            if not edited.equals(edit_df):
+                                if st.button(T("save_changes"), key=f"save_{pet}", type="primary"):
                                     try:
-                                        img = crop_to_square(Image.open(up)); buf = io.BytesIO(); img.save(buf, format="JPEG", quality=80)
-                                        safe_pet = sanitize_key(pet)
-                                        path = f"{st.session_state['user'].id}/{safe_pet}/{int(time.time())}.jpg"
-                                        supabase.storage.from_("pet-photos").upload(path, buf.getvalue(), {"content-type": "image/jpeg"}); url = supabase.storage.from_("pet-photos").get_public_url(path)
-                                        supabase.table("pet_photos").insert({"user_id": st.session_state['user'].id, "pet_name": pet, "photo_url": url}).execute(); st.session_state.processed_files.append(file_id); st.rerun()
-                                    except Exception as e: st.error(str(e))
-                    with t2:
-                        edit_df = p_df.copy(); edited = st.data_editor(edit_df, column_config={"id": None, "user_id": None, "created_at": None, "pet_name": None, "vaccine_type": T("col_vac"), "date_applied": st.column_config.DateColumn(T("col_applied"), format="DD.MM.YYYY"), "next_due_date": st.column_config.DateColumn(T("col_due"), format="DD.MM.YYYY"), "weight": st.column_config.NumberColumn(T("col_weight"), format="%.1f"), "notes": T("col_note")}, hide_index=True, use_container_width=True, key=f"editor_{pet}")
-                        if not edited.equals(edit_df):
-                            if st.button(T("save_changes"), key=f"save_{pet}", type="primary"):
-                                try: recs = edited.to_dict('records'); [r.update({'date_applied': str(r['date_applied']), 'next_due_date': str(r['next_due_date'])}) for r in recs]; supabase.table("vaccinations").upsert(recs).execute(); st.success(T("success_update")); time.sleep(0.5); st.rerun()
-                                except: st.error("Hata")
-                    with t3:
-                        if len(p_df) > 0:
-                            fig = go.Figure(); fig.add_trace(go.Scatter(x=p_df["date_applied"], y=p_df["weight"], mode='lines+markers', line=dict(color='#FF6B6B', width=3, shape='spline'), marker=dict(size=8, color='white', line=dict(color='#FF6B6B', width=2)), fill='tozeroy', fillcolor='rgba(255, 107, 107, 0.1)')); fig.update_layout(height=250, margin=dict(t=10,b=0,l=0,r=0), paper_bgcolor='rgba(0,0,0,0)', plot_bgcolor='rgba(0,0,0,0)', xaxis=dict(showgrid=False, showline=False, color="#718096"), yaxis=dict(showgrid=True, gridcolor='#E2E8F0', color="#718096")); st.plotly_chart(fig, use_container_width=True, config={'displayModeBar': False})
+                                        # Only the rows that changed, one request per operation
+                                        uid = st.session_state["user"].id; inserts, updates, deletes = diff_records(edit_df, edited)
+                                        for r in inserts + updates: r.update({'user_id': uid, 'pet_name': pet})
+                                        if deletes: supabase.table("vaccinations").delete().eq("user_id", uid).in_("id", deletes).execute()
+                                        if updates: supabase.table("vaccinations").upsert(updates).execute()
+                                        if inserts: supabase.table("vaccinations").insert(inserts).execute()
+                                        invalidate(uid, pet); st.success(T("success_update")); time.sleep(0.5); st.rerun()
+                                    except: st.error("Hata")
+                        with t3:
+                            if len(p_df) > 0:
+                                from charts import weight_figure
+                                st.plotly_chart(weight_figure(p_df), use_container_width=True, config={'displayModeBar': False})
                 st.markdown('</div>', unsafe_allow_html=True)
 
     elif selected == T("nav_settings"):
@@ -525,19 +397,41 @@ else:
         if l != st.session_state.lang: st.session_state.lang = l; st.rerun()
         st.write(f"{T('logged_in_as')} {st.session_state['user'].email}")
         
-        try:
-            profile = supabase.table("profiles").select("*").eq("id", st.session_state["user"].id).single().execute()
-            current_sec = profile.data.get("secondary_email", "") if profile.data else ""
-        except: current_sec = ""
+        current_sec = boot["profile"].get("secondary_email") or ""
         c_sec1, c_sec2 = st.columns([3,1])
         with c_sec1: sec_email = st.text_input(T("sec_email_label"), value=current_sec, help=T("sec_email_hint"))
         with c_sec2:
             st.write(""); st.write("")
             if st.button(T("save_btn"), key="save_sec"):
-                supabase.table("profiles").update({"secondary_email": sec_email}).eq("id", st.session_state["user"].id).execute(); st.success("Kaydedildi!")
+                supabase.table("profiles").update({"secondary_email": sec_email}).eq("id", st.session_state["user"].id).execute(); invalidate(st.session_state["user"].id); st.success("Kaydedildi!")
+
+        feed_url = st.secrets.get("CALENDAR_FEED_URL")
+        token = load_calendar_token(supabase, st.session_state["user"].id) if feed_url else None
+        if token:
+            st.caption(T("calendar_feed_label")); st.code(f"{feed_url.rstrip('/')}/calendar/{token}.ics", language=None); st.caption(T("calendar_feed_hint"))
 
         if st.button(T("logout_btn"), type="secondary"): logout()
         st.write("---")
+        with st.expander(T("bulk_exp")):
+            import bulk
+            st.caption(T("bulk_hint"))
+            up = st.file_uploader(T("bulk_upload"), type=["csv", "json", "jsonl", "ndjson"], key="bulk_file")
+            if up is not None and st.button(T("bulk_import_btn"), type="primary"):
+                bar = st.progress(0.0)
+                def on_chunk(done, n): bar.progress(min(1.0, up.tell() / max(up.size, 1)), text=f"{done} {T('bulk_progress')}")
+                try: inserted, errors, pets = bulk.import_file(supabase, st.session_state["user"].id, up, up.name, st.session_state.lang, progress=on_chunk)
+                except Exception as e: st.error(str(e)); st.stop()
+                bar.progress(1.0)
+                for p in pets: invalidate(st.session_state["user"].id, p)
+                if not pets: invalidate(st.session_state["user"].id)
+                st.success(f"{inserted} {T('bulk_done')}")
+                if errors:
+                    st.warning(f"{len(errors)} {T('bulk_errors')}")
+                    st.dataframe(pd.DataFrame(errors, columns=["row", "error"]), hide_index=True, use_container_width=True)
+            # Built only when clicked (deferred download), never on the page run.
+            def export_csv(user_id=st.session_state["user"].id):
+                with bulk.export_file(supabase, user_id) as out: return out.read()
+            st.download_button(T("bulk_download"), export_csv, file_name=f"paticheck_{date.today()}.csv", mime="text/csv", on_click="ignore")
         with st.expander(T("change_pass_exp")):
             new_p = st.text_input(T("new_pass_label"), type="password")
             if st.button(T("update_btn"), type="primary"):
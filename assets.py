@@ -0,0 +1,192 @@
+# --- STATIC ASSETS ---
+# Translations and CSS for app.py. Streamlit re-runs app.py on every interaction, but this module is
+# imported once per process, so these are built once instead of on every script run.
+
+TRANS = {
+    "app_slogan": {"TR": "Evcil hayvanlarınızın sağlığı, kontrol altında.", "EN": "Your pets' health, under control."},
+    "intro_card": {
+        "TR": """<div style="background-color: #FFFFFF; border: 1px solid #E2E8F0; border-radius: 12px; padding: 20px; margin-bottom: 20px; text-align: center; color: #4A5568; font-size: 0.9rem; box-shadow: 0 4px 6px -1px rgba(0,0,0,0.05);"><h4 style="margin-top:0; color:#1A202C;">🐶 Hakkında</h4><p style="margin-bottom:15px;">PatiCheck, evcil dostlarınızın aşı ve kilo takibini kolaylaştırmak için kişisel kullanım amacıyla geliştirilmiş <b>ücretsiz ve amatör</b> bir hobi projesidir.</p><div style="display: inline-block; text-align: left;">✅ Aşı Takvimi ve E-posta Hatırlatmaları<br>✅ Kilo Takibi ve Grafikler<br>✅ Pet Fotoğraf Albümü</div></div>""",
+        "EN": """<div style="background-color: #FFFFFF; border: 1px solid #E2E8F0; border-radius: 12px; padding: 20px; margin-bottom: 20px; text-align: center; color: #4A5568; font-size: 0.9rem; box-shadow: 0 4px 6px -1px rgba(0,0,0,0.05);"><h4 style="margin-top:0; color:#1A202C;">🐶 About</h4><p style="margin-bottom:15px;">PatiCheck is a <b>free, amateur</b> hobby project originally developed for personal use to simplify vaccine and weight tracking for your pets.</p><div style="display: inline-block; text-align: left;">✅ Vaccine Schedule & Email Reminders<br>✅ Weight Tracking & Charts<br>✅ Pet Photo Album</div></div>"""
+    },
+    "login_tab": {"TR": "Giriş Yap", "EN": "Login"},
+    "otp_tab": {"TR": "Kayıt / Şifremi Unuttum", "EN": "Register / Forgot Password"},
+    "welcome_header": {"TR": "Hoşgeldiniz", "EN": "Welcome"},
+    "otp_header": {"TR": "Tek Kullanımlık Kod ile Giriş", "EN": "Login with One-Time Code"},
+    "email_label": {"TR": "Email", "EN": "Email"},
+    "password_label": {"TR": "Şifre", "EN": "Password"},
+    "login_btn": {"TR": "Giriş Yap", "EN": "Login"},
+    "send_code": {"TR": "Kod Gönder", "EN": "Send Code"},
+    "verify_btn": {"TR": "Doğrula", "EN": "Verify"},
+    "code_sent": {"TR": "Kod gönderildi:", "EN": "Code sent to:"},
+    "enter_code": {"TR": "6 Haneli Kod", "EN": "6 Digit Code"},
+    "setup_title": {"TR": "Hesap Kurulumu", "EN": "Account Setup"},
+    "setup_intro": {"TR": "Giriş başarılı! Lütfen isminizi ve kalıcı şifrenizi belirleyin.", "EN": "Login successful! Please set your name and permanent password."},
+    "label_name": {"TR": "İsim", "EN": "Name"},
+    "label_new_pass": {"TR": "Yeni Şifre", "EN": "New Password"},
+    "save_setup": {"TR": "Kaydet ve Başla", "EN": "Save & Start"},
+    "error_login": {"TR": "Email veya şifre hatalı.", "EN": "Invalid email or password."},
+    "error_code": {"TR": "Hatalı Kod.", "EN": "Invalid Code."},
+    "email_confirm_error": {"TR": "Lütfen email onaylayın.", "EN": "Please confirm your email."},
+    "success_setup": {"TR": "Hesap oluşturuldu!", "EN": "Account setup complete!"},
+    "fill_all": {"TR": "Lütfen tüm alanları doldurun.", "EN": "Please fill all fields."},
+    "nav_home": {"TR": "Ana Sayfa", "EN": "Home"},
+    "nav_profiles": {"TR": "Profiller", "EN": "Profiles"},
+    "nav_settings": {"TR": "Ayarlar", "EN": "Settings"},
+    "hello": {"TR": "👋 Merhaba", "EN": "👋 Hello"},
+    "add_main_btn": {"TR": "➕ Pet / Aşı Ekle", "EN": "➕ Add Pet / Vaccine"},
+    "empty_home": {"TR": "Hoşgeldiniz! Henüz bir kayıt yok.", "EN": "Welcome! No records found yet."},
+    "metric_total": {"TR": "Toplam Pet", "EN": "Total Pets"},
+    "metric_upcoming": {"TR": "Yaklaşan", "EN": "Upcoming"},
+    "metric_overdue": {"TR": "Gecikmiş", "EN": "Overdue"},
+    "urgent_header": {"TR": "🚨 ACİL DURUMLAR", "EN": "🚨 URGENT ALERTS"},
+    "days_passed": {"TR": "GÜN GEÇTİ", "EN": "DAYS AGO"},
+    "day_passed": {"TR": "GÜN GEÇTİ", "EN": "DAY AGO"},
+    "days_left": {"TR": "GÜN KALDI", "EN": "DAYS LEFT"},
+    "day_left": {"TR": "GÜN KALDI", "EN": "DAY LEFT"},
+    "days_ok": {"TR": "GÜN VAR", "EN": "DAYS LEFT"},
+    "no_urgent": {"TR": "Harika! Önümüzdeki 7 gün içinde acil bir durum yok.", "EN": "Great! No urgent items in the next 7 days."},
+    "add_vac_btn": {"TR": "Aşı Ekle", "EN": "Add Vax"},
+    "quick_update_btn": {"TR": "💉 Güncelle", "EN": "💉 Update"},
+    "quick_update_pick": {"TR": "Güncellenecek aşı", "EN": "Vaccine to update"},
+    "show_more": {"TR": "Daha Fazla Göster", "EN": "Show More"},
+    "details_expander": {"TR": "Detayları Göster", "EN": "Show Details"},
+    "hide_details": {"TR": "Detayları Gizle", "EN": "Hide Details"},
+    "tab_general": {"TR": "Genel", "EN": "General"},
+    "tab_history": {"TR": "Geçmiş", "EN": "History"},
+    "tab_chart": {"TR": "Grafik", "EN": "Chart"},
+    "metric_weight": {"TR": "Kilo", "EN": "Weight"},
+    "metric_next": {"TR": "Sıradaki", "EN": "Next"},
+    "save_changes": {"TR": "Değişiklikleri Kaydet", "EN": "Save Changes"},
+    "success_update": {"TR": "Güncellendi!", "EN": "Updated!"},
+    "upload_label": {"TR": "Fotoğraf Yükle", "EN": "Upload Photo"},
+    "delete_photo": {"TR": "Sil", "EN": "Delete"},
+    "view_photo": {"TR": "Tam boyut", "EN": "Full size"},
+    "upload_optional": {"TR": "Fotoğraf Ekle (Opsiyonel)", "EN": "Add Photo (Optional)"},
+    "photo_uploading": {"TR": "📤 Fotoğraf yükleniyor...", "EN": "📤 Uploading photo..."},
+    "gallery_header": {"TR": "Fotoğraflar", "EN": "Photos"},
+    "gallery_hint": {"TR": "(Max 3 - Değiştirmek için siliniz)", "EN": "(Max 3 - Delete to replace)"},
+    "settings_title": {"TR": "Ayarlar", "EN": "Settings"},
+    "logged_in_as": {"TR": "Giriş:", "EN": "Logged in as:"},
+    "logout_btn": {"TR": "Çıkış Yap", "EN": "Log Out"},
+    "change_pass_exp": {"TR": "Şifre Değiştir", "EN": "Change Password"},
+    "calendar_feed_label": {"TR": "📅 Takvim Aboneliği", "EN": "📅 Calendar Subscription"},
+    "calendar_feed_hint": {"TR": "Bu bağlantıyı Google, Apple veya Outlook takvimine 'URL ile abone ol' olarak ekleyin; aşı tarihleri kendiliğinden güncellenir. Bağlantıyı kimseyle paylaşmayın.", "EN": "Add this link to Google, Apple or Outlook Calendar as a subscription ('From URL'); due dates update by themselves. Keep the link private."},
+    "bulk_exp": {"TR": "Toplu İçe / Dışa Aktar", "EN": "Bulk Import / Export"},
+    "bulk_hint": {"TR": "CSV, JSON veya JSON Lines. Sütunlar: pet_name, vaccine_type, date_applied, next_due_date, weight, notes. Tarihler YYYY-AA-GG veya GG.AA.YYYY; bitiş boşsa 1 yıl eklenir.", "EN": "CSV, JSON or JSON Lines. Columns: pet_name, vaccine_type, date_applied, next_due_date, weight, notes. Dates as YYYY-MM-DD or DD.MM.YYYY; an empty due date means 1 year."},
+    "bulk_upload": {"TR": "Dosya Seç", "EN": "Choose File"},
+    "bulk_import_btn": {"TR": "📥 İçe Aktar", "EN": "📥 Import"},
+    "bulk_progress": {"TR": "satır okundu", "EN": "rows read"},
+    "bulk_done": {"TR": "kayıt eklendi.", "EN": "records imported."},
+    "bulk_errors": {"TR": "satır atlandı:", "EN": "rows skipped:"},
+    "bulk_download": {"TR": "⬇️ CSV İndir", "EN": "⬇️ Download CSV"},
+    "update_btn": {"TR": "Güncelle", "EN": "Update"},
+    "success_pass": {"TR": "Başarılı!", "EN": "Success!"},
+    "dialog_title": {"TR": "💉 Yeni Aşı Kaydı", "EN": "💉 New Vaccine Record"},
+    "label_pet": {"TR": "Evcil Hayvan", "EN": "Pet"},
+    "opt_new_pet": {"TR": "➕ Yeni Pet Ekle...", "EN": "➕ Add New Pet..."},
+    "label_pet_name": {"TR": "Pet İsmi", "EN": "Pet Name"},
+    "ph_pet_name": {"TR": "Örn: Pamuk", "EN": "e.g. Luna"},
+    "label_vac": {"TR": "Aşı / İşlem", "EN": "Vaccine / Treatment"},
+    "label_weight": {"TR": "Kilo (kg)", "EN": "Weight (kg)"},
+    "label_date": {"TR": "Yapılan Tarih", "EN": "Date Applied"},
+    "label_mode": {"TR": "Hesaplama", "EN": "Calculation"},
+    "opt_auto": {"TR": "Otomatik", "EN": "Automatic"},
+    "opt_manual": {"TR": "Manuel", "EN": "Manual"},
+    "label_validity": {"TR": "Geçerlilik", "EN": "Validity"},
+    "pill_1m": {"TR": "1 Ay", "EN": "1 Mo"},
+    "pill_2m": {"TR": "2 Ay", "EN": "2 Mo"},
+    "pill_3m": {"TR": "3 Ay", "EN": "3 Mo"},
+    "pill_1y": {"TR": "1 Yıl", "EN": "1 Yr"},
+    "label_due_date": {"TR": "Bitiş Tarihi", "EN": "Due Date"},
+    "caption_next": {"TR": "📅 Bir Sonraki Tarih:", "EN": "📅 Next Due Date:"},
+    "label_notes": {"TR": "Notlar", "EN": "Notes"},
+    "ph_notes": {"TR": "Veteriner adı...", "EN": "Vet name..."},
+    "save_btn": {"TR": "Kaydet", "EN": "Save"},
+    "warn_name": {"TR": "Lütfen bir isim girin.", "EN": "Please enter a name."},
+    "warn_date": {"TR": "Lütfen geçerlilik süresini (veya tarihini) seçin.", "EN": "Please select validity or due date."},
+    "success_save": {"TR": "Kaydedildi!", "EN": "Saved!"},
+    "vac_karma": {"TR": "Karma", "EN": "Mixed (Karma)"},
+    "vac_rabies": {"TR": "Kuduz", "EN": "Rabies"},
+    "vac_leukemia": {"TR": "Lösemi", "EN": "Leukemia"},
+    "vac_internal": {"TR": "İç Parazit", "EN": "Internal Parasite"},
+    "vac_external": {"TR": "Dış Parazit", "EN": "External Parasite"},
+    "vac_kc": {"TR": "Bronşin (KC)", "EN": "Kennel Cough"},
+    "vac_lyme": {"TR": "Lyme", "EN": "Lyme"},
+    "vac_checkup": {"TR": "Check-up", "EN": "Check-up"},
+    "col_vac": {"TR": "Aşı", "EN": "Vaccine"},
+    "col_applied": {"TR": "Yapıldı", "EN": "Applied"},
+    "col_due": {"TR": "Bitiş", "EN": "Due"},
+    "col_weight": {"TR": "Kg", "EN": "Kg"},
+    "col_note": {"TR": "Not", "EN": "Note"},
+    "sec_email_label": {"TR": "İkincil Email (Eş/Partner)", "EN": "Secondary Email (Partner)"},
+    "sec_email_hint": {"TR": "Aşı bildirimleri bu adrese de gönderilecektir.", "EN": "Vaccine alerts will also be sent here."},
+}
+
+# --- CSS: DIAMOND GRADE FIX ---
+# BASE_CSS is everything the login screen needs; APP_CSS adds the dashboard-only widgets
+# (dialogs, pills, date inputs, metrics, charts, data editor).
+BASE_CSS = """
+<style>
+    @import url('https://fonts.googleapis.com/css2?family=Inter:wght@400;500;700&display=swap');
+    :root { color-scheme: light !important; }
+    html, body, [class*="css"] { font-family: 'Inter', sans-serif; background-color: #F8F9FA !important; color: #1A202C !important; }
+    .stApp { background-color: #F8F9FA !important; }
+    
+    .stTextInput input, .stNumberInput input, .stDateInput input, .stTextArea textarea { background-color: #FFFFFF !important; color: #1A202C !important; border: 1px solid #E2E8F0 !important; }
+    input[type="password"] { background-color: #FFFFFF !important; color: #1A202C !important; -webkit-text-fill-color: #1A202C !important; }
+    
+    div[data-baseweb="select"] { background-color: #FFFFFF !important; }
+    div[data-baseweb="select"] > div { background-color: #FFFFFF !important; color: #1A202C !important; border-color: #E2E8F0 !important; }
+    div[data-baseweb="select"] span { color: #1A202C !important; }
+    div[data-baseweb="popover"], div[data-baseweb="menu"], ul[role="listbox"] { background-color: #FFFFFF !important; border: 1px solid #E2E8F0 !important; }
+    li[role="option"] { color: #2D3748 !important; background-color: #FFFFFF !important; }
+    li[role="option"]:hover { background-color: #FFF5F5 !important; color: #FF6B6B !important; }
+    
+    div.css-card { 
+        background-color: #FFFFFF; 
+        border: 1px solid #E2E8F0; 
+        border-radius: 16px; 
+        padding: 20px; 
+        box-shadow: 0 4px 6px -1px rgba(0,0,0,0.05);
+        margin-bottom: 24px; /* Added spacing between cards */
+    }
+    
+    div.stButton > button { width: 100%; border-radius: 12px; height: 48px; background-color: #FFFFFF !important; color: #2D3748 !important; border: 2px solid #E2E8F0 !important; font-weight: 700; box-shadow: none !important; }
+    div.stButton > button:hover { border-color: #FF6B6B !important; color: #FF6B6B !important; background-color: #FFF5F5 !important; }
+    div.stButton > button[kind="primary"] { background-color: #FF6B6B !important; color: white !important; border: none !important; box-shadow: 0 4px 6px rgba(255,107,107,0.25) !important; }
+    div.stButton > button[kind="primary"]:hover { background-color: #FA5252 !important; transform: scale(1.01); color: white !important; }
+    
+    /* Specific styling for small buttons inside cards */
+    button[kind="secondary"] { height: 38px !important; }
+    
+    .stTabs [data-baseweb="tab-list"] { gap: 8px; border-bottom: none; margin-bottom: 20px; }
+    .stTabs [data-baseweb="tab"] { height: 40px; background-color: #FFFFFF; border-radius: 20px; color: #718096; border: 1px solid #E2E8F0; font-weight: 600; flex: 1 1 auto; }
+    .stTabs [aria-selected="true"] { background-color: #FF6B6B; color: white !important; border: none; }
+    [data-testid="stSidebar"], footer, #MainMenu { display: none; }
+    div[data-testid="InputInstructions"] { display: none !important; }
+    
+    @media only screen and (max-width: 600px) {
+        .nav-link { font-size: 12px !important; padding: 5px 2px !important; white-space: nowrap !important; }
+        div[data-testid="column"] button { width: 100% !important; margin-top: 10px !important; }
+        div[role="dialog"] { width: 95vw !important; }
+    }
+</style>
+"""
+
+APP_CSS = """
+<style>
+    div[data-testid="stDialog"] > div { background-color: #FFFFFF !important; color: #1A202C !important; }
+    button[aria-label="Close"] { color: #1A202C !important; background-color: transparent !important; border: none !important; }
+    div[data-baseweb="tag"] { background-color: #F1F3F5 !important; border: 1px solid #E2E8F0 !important; }
+    div[data-baseweb="tag"] span { color: #4A5568 !important; }
+    div[data-baseweb="tag"][aria-selected="true"] { background-color: #FF6B6B !important; }
+    div[data-baseweb="tag"][aria-selected="true"] span { color: #FFFFFF !important; }
+    input[type="date"] { color-scheme: light !important; }
+    .streamlit-expanderHeader { background-color: #FFFFFF !important; border: 2px solid #E2E8F0 !important; border-radius: 12px !important; color: #1A202C !important; }
+    div[data-testid="stExpander"] { border: none; box-shadow: none; }
+    [data-testid="stMetricValue"] { color: #1A202C !important; }
+    [data-testid="stMetricLabel"] { color: #718096 !important; }
+    .js-plotly-plot .plotly .main-svg { background-color: transparent !important; }
+    [data-testid="stDataFrame"] { background-color: white !important; border: 1px solid #E2E8F0; }
+</style>
+"""
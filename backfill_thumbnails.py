@@ -0,0 +1,52 @@
+# One-off backfill for sql/007_pet_photos_thumb_url.sql: builds the thumbnail for every pet_photos row
+# that doesn't have one yet (photos uploaded before the image pipeline), stores it under thumbs/ next
+# to the original and fills in thumb_url. Safe to re-run; it only picks up rows still missing a thumbnail.
+#
+#   SUPABASE_URL=... SUPABASE_SERVICE_KEY=... python backfill_thumbnails.py
+import os
+from concurrent.futures import ThreadPoolExecutor
+from images import BUCKET, prepare, storage_path, thumb_path, upload
+
+PAGE_SIZE = int(os.environ.get("BACKFILL_PAGE_SIZE", "100"))
+WORKERS = int(os.environ.get("BACKFILL_WORKERS", "4"))
+
+def missing_pages(client, page_size=PAGE_SIZE):
+    last_id = None
+    while True:
+        query = client.table("pet_photos").select("id, photo_url").is_("thumb_url", "null").order("id").limit(page_size)
+        if last_id is not None: query = query.gt("id", last_id)
+        page = query.execute().data
+        yield page
+        if len(page) < page_size: break
+        last_id = page[-1]["id"]
+
+def backfill_one(client, row):
+    path = storage_path(row["photo_url"])
+    _, thumb = prepare(client.storage.from_(BUCKET).download(path))
+    url = upload(client, thumb_path(path), thumb, upsert=True)
+    client.table("pet_photos").update({"thumb_url": url}).eq("id", row["id"]).execute()
+
+def main():
+    from supabase import create_client
+    try:
+        supabase = create_client(os.environ["SUPABASE_URL"], os.environ["SUPABASE_SERVICE_KEY"])
+    except KeyError as e:
+        print(f"❌ Missing Secret: {e}")
+        exit(1)
+
+    done, failed = 0, 0
+    with ThreadPoolExecutor(max_workers=WORKERS) as pool:
+        for page in missing_pages(supabase):
+            futures = {pool.submit(backfill_one, supabase, row): row for row in page}
+            for fut, row in futures.items():
+                try:
+                    fut.result(); done += 1
+                except Exception as e:
+                    failed += 1
+                    print(f"⚠️ Photo {row['id']} skipped: {e}")
+            print(f"🖼️ {done} thumbnails written...")
+    print(f"🏁 Done. Thumbnails written: {done}. Failed: {failed}")
+    if failed: exit(1)
+
+if __name__ == "__main__":
+    main()
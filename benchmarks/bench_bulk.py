@@ -0,0 +1,69 @@
+# Bulk import/export of a large vaccination history, offline.
+# A synthetic CSV (a few percent of rows invalid) goes through bulk.import_file into a client that
+# counts and drops the insert batches, so time and peak traced memory are parse + validate + batch
+# alone; "row by row" is what the dialog's save would cost, one insert request per record. The
+# accepted rows are then loaded into a LocalClient (replica.py) and exported with bulk.export_file;
+# export time is mostly the stand-in's unindexed filtering, the request count and peak are what matter.
+#   python benchmarks/bench_bulk.py --rows 20000
+import argparse
+import io
+import os
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import bulk
+from replica import LocalClient
+
+VACCINES = ["Karma", "rabies", "DHPP", "İç Parazit", "kennel cough", "Lyme"]
+
+def synthetic_csv(rows, pets=200):
+    out = io.StringIO(); out.write("Pet,Vaccine,Date,Due,Kg,Notes\n")
+    for i in range(rows):
+        applied = f"{1 + i % 28:02d}.{1 + i % 12:02d}.{2000 + i % 25}" if i % 2 else f"{2000 + i % 25}-{1 + i % 12:02d}-{1 + i % 28:02d}"
+        due = "" if i % 3 else f"{2001 + i % 25}-{1 + i % 12:02d}-01"
+        weight = "x" if i % 50 == 7 else f"{4 + (i % 30) / 10}".replace(".", "," if i % 4 else ".")
+        out.write(f"Pet {i % pets},{VACCINES[i % len(VACCINES)]},{'' if i % 97 == 5 else applied},{due},\"{weight}\",kontrol\n")
+    return out.getvalue().encode()
+
+class _Sink:
+    requests = 0
+    def table(self, name): return self
+    def insert(self, rows): self.requests += 1; return self
+    def execute(self): return self
+
+class Counting(LocalClient):
+    requests = 0
+    def table(self, name):
+        query = super().table(name); execute = query.execute
+        def counted(): self.requests += 1; return execute()
+        query.execute = counted
+        return query
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--rows", type=int, default=20_000)
+    args = ap.parse_args()
+    payload = synthetic_csv(args.rows)
+
+    sink = _Sink()
+    t = time.perf_counter(); inserted, errors, _ = bulk.import_file(sink, "bench", io.BytesIO(payload), "bench.csv"); t_import = time.perf_counter() - t
+    tracemalloc.start(); bulk.import_file(_Sink(), "bench", io.BytesIO(payload), "bench.csv")  # peak measured on a second, untimed pass
+    peak_import = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+
+    client = Counting()
+    bulk.import_file(client, "bench", io.BytesIO(payload), "bench.csv"); client.requests = 0
+    tracemalloc.start()
+    t = time.perf_counter(); out = bulk.export_file(client, "bench"); t_export = time.perf_counter() - t
+    peak_export = tracemalloc.get_traced_memory()[1]
+    exported = sum(1 for _ in out) - 1; out.close()
+    tracemalloc.stop()
+
+    print(f"file                 {len(payload) / 1e6:>8.2f} MB   {args.rows} rows")
+    print(f"import:   {inserted:>8} rows   {len(errors):>5} rejected   {sink.requests:>5} requests (row by row: {inserted})   {t_import * 1000:8.1f} ms   peak {peak_import / 1e6:.1f} MB")
+    print(f"export:   {exported:>8} rows   {client.requests:>5} requests   {t_export * 1000:8.1f} ms   peak {peak_export / 1e6:.1f} MB")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,78 @@
+# Calendar feed polling cost, offline.
+# ics_feed.py serves a LocalClient (replica.py) holding synthetic vaccination_latest rows on a local
+# port. Every user's calendar app polls its feed --polls times with the validators of its previous
+# response; between rounds one user's due date moves (the row plus the calendar_feed_changes stamp the
+# sql/009 trigger would write) and the refresher runs once. "uncached" is what a feed that queries on
+# every request would cost: a token lookup plus the user's rows per poll.
+#   python benchmarks/bench_ics.py --users 200 --polls 5
+import argparse
+import os
+import sys
+import threading
+import time
+import urllib.error
+import urllib.request
+from http.server import ThreadingHTTPServer
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from replica import LocalClient
+from ics_feed import FeedCache, make_handler
+
+VACCINES = ["Karma", "Kuduz", "Lösemi", "İç Parazit", "Dış Parazit"]
+
+def seeded_client(users, pets):
+    client = LocalClient()
+    client.table("profiles").insert([{"id": f"user-{u}", "calendar_token": f"token{u:012d}"} for u in range(users)]).execute()
+    client.table("vaccination_latest").insert([
+        {"user_id": f"user-{u}", "pet_name": f"Pet {p}", "vaccine_type": v, "vaccination_id": u * 1000 + p * 10 + i,
+         "next_due_date": f"2027-{1 + (u + p) % 12:02d}-{1 + i * 5:02d}"}
+        for u in range(users) for p in range(pets) for i, v in enumerate(VACCINES)]).execute()
+    return client
+
+def poll(base, token, validators):
+    req = urllib.request.Request(f"{base}/calendar/{token}.ics", headers=validators)
+    try:
+        with urllib.request.urlopen(req) as res:
+            body = res.read()
+            return res.status, len(body), {"If-None-Match": res.headers["ETag"], "If-Modified-Since": res.headers["Last-Modified"]}
+    except urllib.error.HTTPError as e:
+        if e.code != 304: raise
+        return 304, 0, validators
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--users", type=int, default=200)
+    ap.add_argument("--pets", type=int, default=3)
+    ap.add_argument("--polls", type=int, default=5)
+    args = ap.parse_args()
+
+    client = seeded_client(args.users, args.pets)
+    cache = FeedCache(client)
+    server = ThreadingHTTPServer(("127.0.0.1", 0), make_handler(cache))
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    base = f"http://127.0.0.1:{server.server_address[1]}"
+    cache.watermark = client.now()
+
+    validators = [{} for _ in range(args.users)]
+    statuses, sent, rebuilt = {}, 0, 0
+    t = time.perf_counter()
+    for rnd in range(args.polls):
+        for u in range(args.users):
+            status, size, validators[u] = poll(base, f"token{u:012d}", validators[u])
+            statuses[status] = statuses.get(status, 0) + 1; sent += size
+        moved = f"user-{rnd % args.users}"
+        client.table("vaccination_latest").update({"next_due_date": f"2028-01-{1 + rnd % 28:02d}"}).eq("user_id", moved).eq("pet_name", "Pet 0").eq("vaccine_type", "Karma").execute()
+        client.table("calendar_feed_changes").insert({"user_id": moved, "changed_at": client.now()}).execute()
+        rebuilt += cache.refresh()
+        cache.refresh()  # a quiet interval: the watermark query only
+    elapsed = time.perf_counter() - t
+    server.shutdown()
+
+    requests = args.users * args.polls
+    print(f"feed requests        {requests:>8}   ({args.users} users x {args.polls} polls, {args.pets * len(VACCINES)} events each)")
+    print(f"responses            {', '.join(f'{k}: {v}' for k, v in sorted(statuses.items()))}   {sent / 1e3:.1f} kB of bodies")
+    print(f"database queries     {cache.queries:>8}   (uncached: {requests * 2}); feeds rebuilt by refresh: {rebuilt}")
+    print(f"wall time            {elapsed * 1000:8.1f} ms")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,84 @@
+# CPU time and peak memory of processing one uploaded phone photo.
+#   python benchmarks/bench_images.py              -> new pipeline (images.prepare)
+#   python benchmarks/bench_images.py --legacy     -> old path: full decode, full-size crop, re-encode
+#   python benchmarks/bench_images.py --duplicate  -> a repeated upload: normalize + content hash, nothing encoded
+#   python benchmarks/bench_images.py --mp 48      -> bigger source photo
+#   python benchmarks/bench_images.py --noise 0.2  -> less sensor noise: a smaller file, closer to a phone JPEG
+# Run each mode in its own process: peak RSS is per process.
+import argparse
+import io
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from PIL import Image, ImageDraw
+import images
+
+# A 4:3 camera JPEG with sensor-like noise and some edges, so decoder and encoder have real work.
+def synthetic_photo(megapixels=12, quality=92, noise=1.0):
+    w = int((megapixels * 1_000_000 * 4 / 3) ** 0.5); h = w * 3 // 4
+    layers = [Image.effect_noise((w, h), sigma * noise) for sigma in (30, 40, 50)]
+    img = Image.merge("RGB", [Image.blend(Image.linear_gradient("L").resize((w, h)), n, 0.5) for n in layers])
+    draw = ImageDraw.Draw(img)
+    for i in range(0, w, 40): draw.line((i, 0, w - i, h), fill=(i % 255, 120, 200), width=3)
+    buf = io.BytesIO(); img.save(buf, format="JPEG", quality=quality)
+    return buf.getvalue()
+
+def legacy(data):
+    image = Image.open(io.BytesIO(data))
+    width, height = image.size
+    new_size = min(width, height)
+    left, top = (width - new_size)/2, (height - new_size)/2
+    img = image.crop((left, top, left + new_size, top + new_size))
+    buf = io.BytesIO(); img.save(buf, format="JPEG", quality=80)
+    return buf.getvalue(), b""
+
+def duplicate(data):
+    images.content_hash(images.normalize(data))
+    return b"", b""
+
+def peak_rss_mb():
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return rss / (1024 * 1024) if sys.platform == "darwin" else rss / 1024
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--mp", type=float, default=12)
+    ap.add_argument("--runs", type=int, default=5)
+    ap.add_argument("--noise", type=float, default=1.0)
+    ap.add_argument("--legacy", action="store_true")
+    ap.add_argument("--duplicate", action="store_true")
+    ap.add_argument("--make", default="", help=argparse.SUPPRESS)
+    args = ap.parse_args()
+    if args.make:
+        with open(args.make, "wb") as f: f.write(synthetic_photo(args.mp, noise=args.noise))
+        return
+
+    # The source photo is generated in a child process and cached, so building it doesn't count
+    # towards this process's peak memory.
+    path = os.path.join(tempfile.gettempdir(), f"paticheck_bench_{args.mp:g}mp_{args.noise:g}.jpg")
+    if not os.path.exists(path):
+        subprocess.run([sys.executable, __file__, "--make", path, "--mp", str(args.mp), "--noise", str(args.noise)], check=True)
+    with open(path, "rb") as f: data = f.read()
+    base_rss = peak_rss_mb()
+    mode = "legacy" if args.legacy else "duplicate" if args.duplicate else "pipeline"
+    fn = {"legacy": legacy, "duplicate": duplicate, "pipeline": images.prepare}[mode]
+    cpu, wall = [], []
+    for _ in range(args.runs):
+        c, t = time.process_time(), time.perf_counter()
+        display, thumb = fn(data)
+        cpu.append(time.process_time() - c); wall.append(time.perf_counter() - t)
+
+    print(f"mode                 {mode:>10}")
+    print(f"source               {len(data) / 1e6:>9.2f}MB  ({args.mp:g} MP)")
+    print(f"stored image         {len(display) / 1e3:>9.1f}kB  thumbnail {len(thumb) / 1e3:.1f}kB")
+    print(f"cpu per photo        {min(cpu) * 1000:>10.1f}ms")
+    print(f"wall per photo       {min(wall) * 1000:>10.1f}ms")
+    print(f"peak RSS over input  {peak_rss_mb() - base_rss:>10.1f} MB")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,123 @@
+# Dry run / load benchmark for the notifier pipeline. No Supabase, no Gmail, no hour gate:
+# synthetic vaccinations + profiles rows go through notifier.run() into an in-process SMTP sink
+# (or a local debugging SMTP server with --smtp localhost:1025).
+#
+#   python benchmarks/bench_notifier.py --rows 100000
+#   python benchmarks/bench_notifier.py --rows 1000000 --workers 8 --latency 0.002
+import argparse
+import os
+import random
+import resource
+import smtplib
+import sys
+import tempfile
+import time
+from datetime import date, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import notifier
+from email_templates import Renderer
+from ledger import FileLedger
+from runstats import RunStats
+from mailer import SMTPPool, Dispatcher, SinkSMTP
+from wakeup import SLOTS, bucket_for, buckets_for
+
+PETS = ["Pamuk", "Luna", "Boncuk", "Tarçın", "Zeytin", "Max", "Duman", "Fıstık"]
+VACCINES = ["Karma", "Kuduz", "Lösemi", "İç Parazit", "Dış Parazit", "Bronşin (KC)"]
+
+# Streams the `vaccination_latest` table joined with `profiles`, one row at a time, so memory stays flat
+# even at 1M rows. Due dates are spread over +-window days around today.
+def synthetic_rows(n, today, pets_per_user=3, window=180, seed=42):
+    rnd = random.Random(seed)
+    for i in range(1, n + 1):
+        user = (i - 1) // pets_per_user + 1
+        yield {
+            "id": i,
+            "user_id": f"user-{user}",
+            "pet_name": PETS[user % len(PETS)] if pets_per_user == 1 else rnd.choice(PETS),
+            "vaccine_type": rnd.choice(VACCINES),
+            "next_due_date": str(today + timedelta(days=rnd.randint(-window, window))),
+            "profiles": {
+                "email": f"user{user}@example.com",
+                "full_name": f"Kullanıcı {user}",
+                "secondary_email": f"partner{user}@example.com" if user % 5 < 2 else "",
+            },
+        }
+
+# Stand-in for notifier.fetch_due_pages(): the due-date filter + keyset pages the database would do.
+def synthetic_pages(rows, today, counter, page_size, buckets=None):
+    due = {str(today + timedelta(days=d)) for d in notifier.NOTIFY_DAYS}
+    buckets = set(buckets) if buckets is not None else None
+    page = []
+    for row in rows:
+        counter["table_rows"] += 1
+        if row["next_due_date"] in due and (buckets is None or bucket_for(row["user_id"]) in buckets):
+            page.append(row)
+            if len(page) == page_size:
+                yield page
+                page = []
+    yield page
+
+def peak_rss_mb():
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return rss / (1024 * 1024) if sys.platform == "darwin" else rss / 1024
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--rows", type=int, default=100_000)
+    ap.add_argument("--pets-per-user", type=int, default=3)
+    ap.add_argument("--page-size", type=int, default=notifier.PAGE_SIZE)
+    ap.add_argument("--workers", type=int, default=notifier.SMTP_WORKERS)
+    ap.add_argument("--rate", type=float, default=0, help="token bucket rate, 0 = unlimited")
+    ap.add_argument("--latency", type=float, default=0.0, help="simulated seconds per SMTP send in the sink")
+    ap.add_argument("--smtp", default="", help="HOST:PORT of a local plain SMTP sink instead of the in-process one")
+    ap.add_argument("--no-digest", action="store_true")
+    ap.add_argument("--ledger", default="", help="ledger file (default: fresh temp file)")
+    ap.add_argument("--report", default="", help="also write the notifier JSON run report here")
+    ap.add_argument("--slot", type=int, default=None, help=f"only send one shard (0..{SLOTS - 1}), like a single cron tick")
+    args = ap.parse_args()
+
+    today = date.today()
+    sink = []
+    if args.smtp:
+        host, port = args.smtp.rsplit(":", 1)
+        connect = lambda: smtplib.SMTP(host, int(port))
+    else:
+        connect = lambda: SinkSMTP(sink, latency=args.latency)
+
+    tmp = tempfile.TemporaryDirectory()
+    ledger = FileLedger(args.ledger or os.path.join(tmp.name, "ledger.jsonl"))
+    stats = RunStats()
+    pool = SMTPPool("bench@example.com", "", size=args.workers, rate=args.rate, burst=args.workers, connect=connect, stats=stats)
+    dispatcher = Dispatcher(pool, workers=args.workers, retries=0, on_sent=lambda to, tag: ledger.record(tag[1]), verbose=False, stats=stats)
+    renderer = Renderer(notifier.APP_URL, "bench@example.com")
+
+    counter = {"table_rows": 0}
+    buckets = buckets_for([args.slot]) if args.slot is not None else None
+    pages = synthetic_pages(synthetic_rows(args.rows, today, args.pets_per_user), today, counter, args.page_size, buckets)
+
+    t0 = time.perf_counter()
+    notifier.run(pages, today, ledger, renderer, dispatcher, digest=not args.no_digest, verbose=False, stats=stats)
+    t_run = time.perf_counter() - t0
+    dispatcher.close()
+    pool.close()
+    t_total = time.perf_counter() - t0
+    tmp.cleanup()
+    stats.count("sent", dispatcher.sent)
+    stats.count("failed", len(dispatcher.failures))
+    if args.report: stats.write(args.report, bench=vars(args))
+    c = stats.counters
+
+    print(f"rows in table        {counter['table_rows']:>10}")
+    print(f"rows due             {c['rows_scanned']:>10}")
+    print(f"messages rendered    {c['rendered']:>10}")
+    print(f"messages delivered   {dispatcher.sent:>10}   failed {len(dispatcher.failures)}")
+    print(f"scan+render time     {t_run:>10.2f}s")
+    print(f"total time           {t_total:>10.2f}s")
+    print(f"rows scanned/s       {counter['table_rows'] / t_run:>10.0f}")
+    print(f"messages rendered/s  {c['rendered'] / t_run:>10.0f}")
+    print(f"messages delivered/s {dispatcher.sent / t_total:>10.0f}")
+    print(f"peak memory (RSS)    {peak_rss_mb():>10.1f} MB")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,151 @@
+# Render cost per notifier message.
+#   python benchmarks/bench_render.py            -> 10k and 100k messages
+#   python benchmarks/bench_render.py 250000     -> custom sizes
+import os
+import random
+import sys
+import time
+from email.mime.multipart import MIMEMultipart
+from email.mime.text import MIMEText
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from email_templates import Renderer, clean_text, gcal_link
+
+APP_URL = "https://paticheck.streamlit.app"
+SMTP_USER = "bench@example.com"
+
+PETS = ["Pamuk", "Luna", "Boncuk", "Tarçın", "Zeytin", "Max"]
+VACCINES = ["Karma", "Kuduz", "Lösemi", "İç Parazit", "Dış Parazit"]
+OFFSETS = [7, 3, 1, 0, -3, -7]
+
+# Roughly what a run looks like: households with 1-3 due items, ~40% with a secondary address.
+def synthetic_messages(n, seed=42):
+    rnd = random.Random(seed)
+    out = []
+    h = 0
+    while len(out) < n:
+        h += 1
+        name = f"Kullanıcı {h}"
+        items = tuple((rnd.choice(PETS), rnd.choice(VACCINES), f"2026-10-{rnd.randint(10, 28)}", rnd.choice(OFFSETS)) for _ in range(rnd.randint(1, 3)))
+        out.append((f"user{h}@example.com", name, items))
+        if rnd.random() < 0.4: out.append((f"partner{h}@example.com", name, items))
+    return out[:n]
+
+# --- BASELINE ---
+# The notifier's render path before email_templates.py, copied unchanged: per-status branch, one
+# f-string body per message and a fresh MIMEMultipart per recipient (deliver()).
+def status_style(days_left):
+    if days_left < 0:
+        return {"color": "#D93025", "bg_color": "#FCE8E6", "header_tr": "GECİKTİ", "header_en": "OVERDUE",
+                "status_tr": f"{abs(days_left)} gün geçti", "status_en": f"{abs(days_left)} days overdue",
+                "intro_tr": "Bu aşı tarihi geçmiş durumda.", "intro_en": "This vaccination is past due."}
+    elif days_left == 0:
+        return {"color": "#F9AB00", "bg_color": "#FEF7E0", "header_tr": "BUGÜN", "header_en": "TODAY",
+                "status_tr": "Bugün Yapılmalı", "status_en": "Due Today",
+                "intro_tr": "Aşı günü geldi çattı!", "intro_en": "Vaccination day is here!"}
+    elif days_left <= 3:
+        return {"color": "#E37400", "bg_color": "#FFF3E0", "header_tr": "AZ KALDI", "header_en": "SOON",
+                "status_tr": f"{days_left} gün kaldı", "status_en": f"{days_left} days left",
+                "intro_tr": "Veteriner zamanı yaklaşıyor.", "intro_en": "Vet time is approaching."}
+    else:
+        return {"color": "#188038", "bg_color": "#E6F4EA", "header_tr": "HATIRLATMA", "header_en": "REMINDER",
+                "status_tr": f"{days_left} gün kaldı", "status_en": f"{days_left} days left",
+                "intro_tr": "Önümüzdeki hafta için hatırlatma.", "intro_en": "Reminder for the upcoming week."}
+
+def render_alert(name, pet, vaccine, due_date, days_left):
+    pet_clean = clean_text(pet)
+    vaccine_clean = clean_text(vaccine)
+    greeting = f"Merhaba {name}," if name else "Merhaba / Hello,"
+    style = status_style(days_left)
+    color, bg_color = style["color"], style["bg_color"]
+
+    subject = f"PatiCheck: {pet_clean} - {vaccine_clean}"
+    html = f"""
+    <div style="font-family: Helvetica, Arial, sans-serif; max-width: 500px; margin: 0 auto; color: #333;">
+        <div style="border: 1px solid #e0e0e0; border-radius: 12px; overflow: hidden;">
+            <div style="background-color: {color}; padding: 15px; text-align: center; color: white;">
+                <h3 style="margin:0;">{style["header_tr"]} | {style["header_en"]}</h3>
+            </div>
+            <div style="padding: 25px; background-color: #ffffff;">
+                <p>{greeting}</p>
+                <div style="text-align: center; margin: 25px 0;">
+                    <div style="font-size: 28px; font-weight: 900;">{pet_clean}</div>
+                    <div style="font-size: 20px; color: #555;">{vaccine_clean}</div>
+                </div>
+                <div style="background-color: {bg_color}; border-radius: 8px; padding: 15px; text-align: center;">
+                    <div style="font-weight: bold; color: {color};">{style["status_tr"]}</div>
+                    <div style="font-size: 12px; color: #666;">{style["status_en"]}</div>
+                    <div style="margin-top:5px; font-weight:bold; color:#333;">{due_date}</div>
+                </div>
+                <div style="text-align: center; margin-top: 25px;">
+                    <a href="{gcal_link(pet_clean, vaccine_clean, due_date)}" style="background-color: {color}; color: white; padding: 12px 24px; text-decoration: none; border-radius: 6px; font-weight: bold; font-size: 14px;">📅 Takvime Ekle / Add to Calendar</a>
+                </div>
+            </div>
+        </div>
+        <p style="text-align: center; font-size: 11px; color: #aaa; margin-top: 20px;"><a href="{APP_URL}" style="color: #aaa;">PatiCheck App</a></p>
+    </div>
+    """
+    return subject, html
+
+# One email per household: every due pet/vaccine in a single list, most urgent first.
+def render_digest(name, items):
+    if len(items) == 1:
+        it = items[0]
+        return render_alert(name, it["pet"], it["vaccine"], it["due_date"], it["days_left"])
+
+    items = sorted(items, key=lambda it: it["days_left"])
+    greeting = f"Merhaba {name}," if name else "Merhaba / Hello,"
+    top = status_style(items[0]["days_left"])
+
+    rows_html = ""
+    for it in items:
+        pet_clean, vaccine_clean = clean_text(it["pet"]), clean_text(it["vaccine"])
+        style = status_style(it["days_left"])
+        rows_html += f"""
+                <div style="background-color: {style["bg_color"]}; border-radius: 8px; padding: 12px 15px; margin-bottom: 10px;">
+                    <div style="font-size: 11px; font-weight: bold; color: {style["color"]};">{style["header_tr"]} | {style["header_en"]}</div>
+                    <div style="font-size: 18px; font-weight: 900;">{pet_clean} <span style="font-weight: normal; color: #555;">- {vaccine_clean}</span></div>
+                    <div style="font-size: 13px;"><b style="color: {style["color"]};">{style["status_tr"]}</b> <span style="color: #666;">/ {style["status_en"]}</span> &middot; <b>{it["due_date"]}</b></div>
+                    <div style="margin-top: 6px; font-size: 12px;"><a href="{gcal_link(pet_clean, vaccine_clean, it["due_date"])}" style="color: {style["color"]};">📅 Takvime Ekle / Add to Calendar</a></div>
+                </div>"""
+
+    subject = f"PatiCheck: {len(items)} hatırlatma / reminders"
+    html = f"""
+    <div style="font-family: Helvetica, Arial, sans-serif; max-width: 500px; margin: 0 auto; color: #333;">
+        <div style="border: 1px solid #e0e0e0; border-radius: 12px; overflow: hidden;">
+            <div style="background-color: {top["color"]}; padding: 15px; text-align: center; color: white;">
+                <h3 style="margin:0;">{len(items)} AŞI | {len(items)} VACCINES</h3>
+            </div>
+            <div style="padding: 25px; background-color: #ffffff;">
+                <p>{greeting}</p>{rows_html}
+            </div>
+        </div>
+        <p style="text-align: center; font-size: 11px; color: #aaa; margin-top: 20px;"><a href="{APP_URL}" style="color: #aaa;">PatiCheck App</a></p>
+    </div>
+    """
+    return subject, html
+
+def legacy(to, name, items):
+    subject, html = render_digest(name, [{"pet": p, "vaccine": v, "due_date": d, "days_left": n} for p, v, d, n in items])
+    msg = MIMEMultipart()
+    msg['Subject'] = subject
+    msg['From'] = f"PatiCheck <{SMTP_USER}>"
+    msg['To'] = to
+    msg.attach(MIMEText(html, 'html'))
+    return msg.as_string()
+
+def bench(label, n, fn):
+    msgs = synthetic_messages(n)
+    t = time.perf_counter()
+    for to, name, items in msgs: fn(to, name, items)
+    dt = time.perf_counter() - t
+    print(f"{label:<32} n={n:<8} total={dt:7.2f}s  per_msg={dt / n * 1e6:8.1f}µs")
+
+if __name__ == "__main__":
+    sizes = [int(a) for a in sys.argv[1:]] or [10_000, 100_000]
+    for n in sizes:
+        r = Renderer(APP_URL, SMTP_USER)
+        bench("templates + shared bodies", n, lambda to, name, items: r.message(r.render(name, items), to))
+        r = Renderer(APP_URL, SMTP_USER, cache_size=0)
+        bench("templates, no body reuse", n, lambda to, name, items: r.message(r.render(name, items), to))
+        bench("legacy f-string + MIMEMultipart", n, legacy)
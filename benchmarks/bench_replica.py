@@ -0,0 +1,79 @@
+# Cache-miss cost of the dashboard data with and without the local replica, offline.
+# A LocalClient (replica.py) plays Supabase; "bootstrap" is what a cache miss fetches without the
+# replica (one get_bootstrap() call carrying every vaccination + photo row of the user), "replica" is
+# the replica_delta() sync after one edit plus the indexed local queries data.py runs instead. Times
+# are in-process (no network), so the request, row and byte counts are the numbers that matter.
+#   python benchmarks/bench_replica.py --rows 20000
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from replica import LocalClient, Replica
+from data import HOME_COLUMNS, PET_COLUMNS, PHOTO_COLUMNS, PROFILE_COLUMNS, frame
+
+VACCINES = ["Karma", "Kuduz", "Lösemi", "İç Parazit", "Dış Parazit"]
+
+def seeded_client(rows, pets):
+    client = LocalClient(user_id="bench")
+    client.table("profiles").insert({"id": "bench", "email": "bench@example.com", "full_name": "Bench", "secondary_email": ""}).execute()
+    client.table("vaccinations").insert([
+        {"user_id": "bench", "pet_name": f"Pet {i % pets}", "vaccine_type": VACCINES[i % len(VACCINES)],
+         "date_applied": f"{2000 + i % 25}-{1 + i % 12:02d}-01", "next_due_date": f"{2001 + i % 25}-{1 + i % 12:02d}-01",
+         "weight": 4 + (i % 30) / 10, "notes": "Veteriner kontrolü, bir sonraki dozda hatırlatma." * 2}
+        for i in range(rows)]).execute()
+    return client
+
+# Table rows in a response: a plain list, or the lists inside an RPC payload ({"rows": [...]} per table for replica_delta).
+def row_count(data):
+    if isinstance(data, list): return len(data)
+    return sum(row_count(v.get("rows", [])) if isinstance(v, dict) else row_count(v) for v in data.values() if isinstance(v, (list, dict)))
+
+# Counts requests, rows and JSON bytes that would cross the network.
+class Counting:
+    def __init__(self, client): self.client, self.requests, self.rows, self.bytes = client, 0, 0, 0
+    def _count(self, call):
+        execute = call.execute
+        def counted():
+            res = execute(); self.requests += 1; self.rows += row_count(res.data); self.bytes += len(json.dumps(res.data)); return res
+        call.execute = counted
+        return call
+    def table(self, name): return self._count(self.client.table(name))
+    def rpc(self, name, params=None): return self._count(self.client.rpc(name, params))
+
+def bootstrap(client, user_id):
+    payload = client.rpc("get_bootstrap").execute().data
+    return frame(payload["vaccinations"], PET_COLUMNS), frame(payload["latest"], HOME_COLUMNS), frame(payload["photos"], PHOTO_COLUMNS), payload["profile"]
+
+def from_replica(rep, client, user_id):
+    rep.sync(client, user_id)
+    return (frame(rep.vaccinations(user_id, PET_COLUMNS), PET_COLUMNS), frame(rep.latest(user_id, HOME_COLUMNS), HOME_COLUMNS),
+            frame(rep.photos(user_id, PHOTO_COLUMNS), PHOTO_COLUMNS), rep.profile(user_id, PROFILE_COLUMNS))
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--rows", type=int, default=20_000)
+    ap.add_argument("--pets", type=int, default=40)
+    ap.add_argument("--delete", action="store_true", help="also delete a row upstream (forces the id check)")
+    args = ap.parse_args()
+
+    remote = seeded_client(args.rows, args.pets)
+    tmp = tempfile.TemporaryDirectory()
+    rep = Replica(os.path.join(tmp.name, "replica.db"))
+    rep.sync(remote, "bench")  # initial copy, once per install
+    remote.table("vaccinations").update({"notes": "edited"}).eq("id", 2).execute()
+    if args.delete: remote.table("vaccinations").delete().eq("id", 3).execute()
+
+    c = Counting(remote); t = time.perf_counter(); bootstrap(c, "bench"); t_download = time.perf_counter() - t
+    r = Counting(remote); t = time.perf_counter(); from_replica(rep, r, "bench"); t_replica = time.perf_counter() - t
+    tmp.cleanup()
+
+    print(f"rows in account      {args.rows:>10}")
+    print(f"bootstrap:{c.requests:>3} requests {c.rows:>8} rows {c.bytes / 1e6:>8.2f} MB   {t_download * 1000:8.1f} ms")
+    print(f"replica:  {r.requests:>3} requests {r.rows:>8} rows {r.bytes / 1e6:>8.2f} MB   {t_replica * 1000:8.1f} ms   (delta sync + local SQL)")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,97 @@
+# Cold-start cost of the cron entry points and the Streamlit app.
+#  - imports: median wall time of a fresh interpreter that only imports the given modules.
+#  - first paint: a fresh interpreter runs app.py once through streamlit's AppTest (login screen, or
+#    the Home dashboard with a logged-in user and an offline client serving a synthetic bootstrap
+#    payload). Time from the first line of the fresh process (interpreter boot not included, see
+#    "python (empty)") to the end of that first script run, plus the warm rerun right after it.
+# Modules that are not installed are reported as skipped.
+#   python benchmarks/bench_startup.py
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+from datetime import date, timedelta
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+TARGETS = {
+    "python (empty)": "pass",
+    "wakeup.py (every tick)": "import wakeup",
+    "notifier.py (email ticks)": "import notifier; import supabase",
+    "old notifier.py imports (every tick)": "import supabase, requests, smtplib, email.mime.multipart",
+    "app.py imports (login screen)": "import streamlit, supabase, assets",
+    "app.py imports (dashboard)": "import streamlit, supabase, assets, pandas, numpy, streamlit_option_menu, data",
+    "old app.py imports": "import streamlit, pandas, plotly.graph_objects, supabase, streamlit_option_menu, PIL.Image",
+}
+
+PAGES = ["login", "dashboard"]
+
+def measure(code, runs=7):
+    times = []
+    for _ in range(runs):
+        t = time.perf_counter()
+        res = subprocess.run([sys.executable, "-c", code], cwd=ROOT, capture_output=True)
+        times.append(time.perf_counter() - t)
+        if res.returncode != 0: return None
+    return statistics.median(times)
+
+# --- FIRST PAINT ---
+class _Result:
+    def __init__(self, data): self.data = data
+    def execute(self): return self
+
+# Answers get_bootstrap with a few pets; every other query comes back empty.
+class _OfflineClient:
+    def __init__(self, payload): self.payload = payload
+    def rpc(self, name, params=None): return _Result(self.payload if name == "get_bootstrap" else None)
+    def table(self, name): return self
+    def __getattr__(self, name): return lambda *a, **k: self
+    def execute(self): return _Result([])
+
+def synthetic_bootstrap(pets=3, doses=8):
+    today = date.today(); rows = []
+    for p in range(pets):
+        for d in range(doses):
+            applied = today - timedelta(days=365 * (doses - d))
+            rows.append({"id": p * doses + d + 1, "pet_name": f"Pet {p + 1}", "vaccine_type": "Karma", "date_applied": str(applied),
+                         "next_due_date": str(applied + timedelta(days=365 + p * 3)), "weight": 4.0 + d * 0.2})
+    return {"profile": {"id": "bench", "email": "bench@example.com", "full_name": "Bench", "secondary_email": ""}, "vaccinations": rows, "photos": []}
+
+def paint(page):
+    t0 = time.perf_counter()
+    sys.path.insert(0, ROOT)
+    import supabase
+    from streamlit.testing.v1 import AppTest
+    supabase.create_client = lambda url, key: _OfflineClient(synthetic_bootstrap())
+    at = AppTest.from_file(os.path.join(ROOT, "app.py"), default_timeout=120)
+    at.secrets["SUPABASE_URL"] = "http://localhost"; at.secrets["SUPABASE_KEY"] = "bench"
+    if page == "dashboard":
+        at.session_state["user"] = type("User", (), {"id": "bench", "email": "bench@example.com", "user_metadata": {}})()
+    at.run()
+    first = time.perf_counter() - t0
+    t = time.perf_counter(); at.run(); rerun = time.perf_counter() - t
+    if at.exception: raise SystemExit(str(at.exception[0].message))
+    print(json.dumps({"first": first, "rerun": rerun}))
+
+def measure_paint(page, runs=3):
+    firsts, reruns = [], []
+    for _ in range(runs):
+        res = subprocess.run([sys.executable, os.path.abspath(__file__), "--paint", page], cwd=ROOT, capture_output=True, text=True)
+        if res.returncode != 0: return None
+        out = json.loads(res.stdout.strip().splitlines()[-1])
+        firsts.append(out["first"]); reruns.append(out["rerun"])
+    return statistics.median(firsts), statistics.median(reruns)
+
+if __name__ == "__main__":
+    if "--paint" in sys.argv:
+        paint(sys.argv[sys.argv.index("--paint") + 1])
+        sys.exit(0)
+    for label, code in TARGETS.items():
+        t = measure(code)
+        print(f"{label:<40} {'skipped (not installed)' if t is None else f'{t * 1000:8.1f} ms'}")
+    for page in PAGES:
+        r = measure_paint(page)
+        label = f"first paint: {page}"
+        print(f"{label:<40} {'skipped (not installed)' if r is None else f'{r[0] * 1000:8.1f} ms   (warm rerun {r[1] * 1000:.1f} ms)'}")
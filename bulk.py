@@ -0,0 +1,188 @@
+import csv
+import io
+import os
+import tempfile
+import unicodedata
+import pandas as pd
+from assets import TRANS
+
+# --- BULK IMPORT / EXPORT ---
+# For shelters and clinics moving years of records in at once. Files are read in CHUNK_ROWS pieces
+# (CSV and JSON Lines stream; a plain JSON array is parsed whole, then chunked), every chunk is
+# validated and normalized column-wise, and valid rows go out in INSERT_BATCH-row inserts. Export
+# pages through the table by id into a spooled temp file, so neither side holds a whole account.
+CHUNK_ROWS = 5000
+INSERT_BATCH = 500
+EXPORT_PAGE = 1000
+COLUMNS = ["pet_name", "vaccine_type", "date_applied", "next_due_date", "weight", "notes"]
+DEFAULT_VALIDITY_DAYS = 365  # same default as the dialog's "1 year" pill
+
+# Header spellings accepted on import.
+COLUMN_ALIASES = {
+    "pet": "pet_name", "pet name": "pet_name", "name": "pet_name", "hayvan": "pet_name", "pet adi": "pet_name",
+    "vaccine": "vaccine_type", "vaccine type": "vaccine_type", "asi": "vaccine_type", "asi turu": "vaccine_type",
+    "date": "date_applied", "applied": "date_applied", "date applied": "date_applied", "yapildi": "date_applied", "tarih": "date_applied",
+    "due": "next_due_date", "due date": "next_due_date", "next due": "next_due_date", "bitis": "next_due_date",
+    "kg": "weight", "kilo": "weight", "note": "notes", "not": "notes", "notlar": "notes",
+}
+
+# Vaccine spellings -> TRANS key; stored as the label in the importing user's language.
+VACCINE_KEYS = ["vac_karma", "vac_rabies", "vac_leukemia", "vac_internal", "vac_external", "vac_kc", "vac_lyme", "vac_checkup"]
+VACCINE_ALIASES = {
+    "dhpp": "vac_karma", "dhppi": "vac_karma", "fvrcp": "vac_karma", "mixed": "vac_karma", "karma asi": "vac_karma",
+    "kuduz asisi": "vac_rabies", "rabies vaccine": "vac_rabies",
+    "felv": "vac_leukemia", "feline leukemia": "vac_leukemia",
+    "ic parazit": "vac_internal", "deworming": "vac_internal", "dis parazit": "vac_external", "flea": "vac_external", "tick": "vac_external",
+    "bronsin": "vac_kc", "kc": "vac_kc", "bordetella": "vac_kc", "kennel cough": "vac_kc",
+    "checkup": "vac_checkup", "kontrol": "vac_checkup",
+}
+
+def fold(text):
+    text = unicodedata.normalize("NFKD", str(text).replace("ı", "i").replace("İ", "I")).encode("ascii", "ignore").decode()
+    return " ".join(text.casefold().replace("_", " ").replace("-", " ").split())
+
+def _vaccine_map(lang):
+    out = {fold(alias): key for alias, key in VACCINE_ALIASES.items()}
+    for key in VACCINE_KEYS:
+        for label in TRANS[key].values(): out[fold(label)] = key
+    return {alias: TRANS[key][lang] for alias, key in out.items()}
+
+# --- READ ---
+def read_chunks(file, name="", chunksize=CHUNK_ROWS):
+    name = (name or getattr(file, "name", "")).lower()
+    if name.endswith((".jsonl", ".ndjson")):
+        yield from pd.read_json(file, lines=True, chunksize=chunksize, dtype=False)
+    elif name.endswith(".json"):
+        df = pd.read_json(file, dtype=False)
+        for start in range(0, len(df), chunksize): yield df.iloc[start:start + chunksize]
+    else:
+        yield from pd.read_csv(file, chunksize=chunksize, dtype=str, keep_default_na=False, skipinitialspace=True)
+
+def _dates(col):
+    s = col.astype("string").str.strip()
+    d = pd.to_datetime(s, format="%Y-%m-%d", errors="coerce")
+    for fmt in ("%d.%m.%Y", "%d/%m/%Y"):
+        d = d.fillna(pd.to_datetime(s, format=fmt, errors="coerce"))
+    return d
+
+# chunk -> (valid records ready to insert, their file rows, [(row number, error)]). `first_row` is the
+# 1-based file row of the chunk's first record, so errors point at the line the user sees.
+# vaccine_type must be one of the dialog's vaccines (any spelling in VACCINE_ALIASES or TRANS): the
+# app only ever writes those, and an unknown one would be a typo the user never sees again.
+def normalize(chunk, first_row=1, lang="TR", vaccines=None):
+    df = chunk.rename(columns=lambda c: COLUMN_ALIASES.get(fold(c), fold(c).replace(" ", "_")))
+    df = df.reindex(columns=COLUMNS).reset_index(drop=True)
+    rows = pd.Series(range(first_row, first_row + len(df)))
+    vaccines = vaccines or _vaccine_map(lang)
+
+    pet = df["pet_name"].astype("string").str.strip()
+    raw_vac = df["vaccine_type"].astype("string").str.strip()
+    vac = raw_vac.map({v: vaccines.get(fold(v)) for v in raw_vac.dropna().unique()})  # fold each distinct spelling once
+    applied = _dates(df["date_applied"])
+    due = _dates(df["next_due_date"])
+    due_given = df["next_due_date"].astype("string").str.strip().fillna("") != ""
+    due = due.where(due_given, applied + pd.Timedelta(days=DEFAULT_VALIDITY_DAYS))
+    weight_raw = df["weight"].astype("string").str.strip().str.replace(",", ".", regex=False).fillna("")
+    weight = pd.to_numeric(weight_raw.where(weight_raw != "", None), errors="coerce")
+    notes = df["notes"].astype("string").fillna("").str.strip()
+
+    checks = [
+        (pet.fillna("") == "", "pet_name is empty"),
+        (raw_vac.fillna("") == "", "vaccine_type is empty"),
+        (vac.isna(), "vaccine_type is not a known vaccine (" + ", ".join(sorted(set(vaccines.values()))) + ")"),
+        (applied.isna(), "date_applied is not a date (YYYY-MM-DD or DD.MM.YYYY)"),
+        (due_given & due.isna(), "next_due_date is not a date (YYYY-MM-DD or DD.MM.YYYY)"),
+        (due.notna() & applied.notna() & (due < applied), "next_due_date is before date_applied"),
+        ((weight_raw != "") & weight.isna(), "weight is not a number"),
+    ]
+    bad = pd.Series(False, index=df.index)
+    errors = []
+    for mask, message in checks:
+        mask = mask.fillna(False).astype(bool)
+        errors += [(int(r), message) for r in rows[mask & ~bad]]
+        bad |= mask
+    ok = ~bad
+    records = pd.DataFrame({
+        "pet_name": pet[ok], "vaccine_type": vac[ok],
+        "date_applied": applied[ok].dt.strftime("%Y-%m-%d"), "next_due_date": due[ok].dt.strftime("%Y-%m-%d"),
+        "weight": weight[ok].astype(object).where(weight[ok].notna(), None), "notes": notes[ok],
+    }).astype(object).to_dict("records")
+    return records, rows[ok].tolist(), sorted(errors)
+
+# --- IMPORT ---
+# progress(rows_done, inserted) is called after every chunk (st.progress in the app).
+# Returns (inserted, [(row, error)], pet names written) so the caller can invalidate their caches.
+def import_file(client, user_id, file, name="", lang="TR", batch=INSERT_BATCH, progress=None):
+    inserted, errors, done, pets = 0, [], 0, set()
+    vaccines = _vaccine_map(lang)
+    first_row = 2 if not name.lower().endswith((".json", ".jsonl", ".ndjson")) else 1  # CSV: line 1 is the header
+    for chunk in read_chunks(file, name):
+        records, record_rows, chunk_errors = normalize(chunk, first_row + done, lang, vaccines)
+        errors += chunk_errors
+        for start in range(0, len(records), batch):
+            part = [{**r, "user_id": user_id} for r in records[start:start + batch]]
+            span = record_rows[start:start + len(part)]  # not contiguous when rejected rows sit in between
+            where = f"rows {span[0]}–{span[-1]}" if len(span) > 1 else f"row {span[0]}"
+            try:
+                client.table("vaccinations").insert(part).execute(); inserted += len(part); pets.update(r["pet_name"] for r in part)
+            except Exception as e:
+                errors.append((span[0], f"{where}: batch of {len(part)} rows failed: {e}"))
+        done += len(chunk)
+        if progress: progress(done, inserted)
+    return inserted, errors, pets
+
+# --- EXPORT ---
+def iter_rows(client, user_id, page_size=EXPORT_PAGE):
+    last_id = None
+    while True:
+        query = client.table("vaccinations").select(", ".join(["id"] + COLUMNS)).eq("user_id", user_id).order("id").limit(page_size)
+        if last_id is not None: query = query.gt("id", last_id)
+        page = query.execute().data
+        yield from page
+        if len(page) < page_size: break
+        last_id = page[-1]["id"]
+
+# Returns a file object positioned at 0 (in memory up to max_size, then on disk).
+def export_file(client, user_id, fmt="csv", max_size=5 * 1024 * 1024):
+    out = tempfile.SpooledTemporaryFile(max_size=max_size, mode="w+b")
+    text = io.TextIOWrapper(out, encoding="utf-8", newline="")
+    if fmt == "csv":
+        writer = csv.DictWriter(text, fieldnames=COLUMNS, extrasaction="ignore")
+        writer.writeheader()
+        for row in iter_rows(client, user_id): writer.writerow(row)
+    else:
+        import json
+        for row in iter_rows(client, user_id): text.write(json.dumps({c: row.get(c) for c in COLUMNS}, ensure_ascii=False) + "\n")
+    text.flush(); text.detach(); out.seek(0)
+    return out
+
+# Command line for bulk jobs with the service key:
+#   python bulk.py import USER_ID records.csv
+#   python bulk.py export USER_ID backup.csv   (.jsonl -> JSON Lines)
+def main():
+    import sys
+    from supabase import create_client
+    if len(sys.argv) != 4 or sys.argv[1] not in ("import", "export"):
+        print("usage: python bulk.py import|export USER_ID FILE"); exit(2)
+    cmd, user_id, path = sys.argv[1:]
+    try:
+        supabase = create_client(os.environ["SUPABASE_URL"], os.environ["SUPABASE_SERVICE_KEY"])
+    except KeyError as e:
+        print(f"❌ Missing Secret: {e}")
+        exit(1)
+    if cmd == "import":
+        with open(path, "rb") as f:
+            inserted, errors, _ = import_file(supabase, user_id, f, path, progress=lambda done, n: print(f"📥 {done} rows read, {n} inserted..."))
+        for row, message in errors: print(f"   - row {row}: {message}")
+        print(f"🏁 Done. Inserted: {inserted}. Rejected: {len(errors)}")
+    else:
+        src = export_file(supabase, user_id, "jsonl" if path.endswith((".jsonl", ".ndjson")) else "csv")
+        with open(path, "wb") as f:
+            while True:
+                block = src.read(1 << 16)
+                if not block: break
+                f.write(block)
+        print(f"🏁 Exported to {path}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,45 @@
+import hashlib
+import os
+import numpy as np
+import pandas as pd
+import plotly.graph_objects as go
+import streamlit as st
+from data import CHART_COLUMNS
+
+# --- WEIGHT CHART ---
+# Figures are cached by a hash of the pet's (date_applied, weight) series, so reruns and pets whose
+# history didn't change reuse the already-built figure dict instead of rebuilding and re-serializing it.
+# Long histories are downsampled with LTTB (largest triangle three buckets) above CHART_MAX_POINTS,
+# which keeps the first/last point and the visible peaks and dips. 0 -> never downsample.
+CHART_MAX_POINTS = int(os.environ.get("CHART_MAX_POINTS", "200"))
+
+def lttb(x, y, n):
+    size = len(x)
+    if n >= size or n < 3: return np.arange(size)
+    idx = np.empty(n, dtype=int); idx[0], idx[-1] = 0, size - 1
+    edges = np.linspace(1, size - 1, n - 1).astype(int)  # n - 2 buckets between the two end points
+    a = 0
+    for i in range(n - 2):
+        start, end = edges[i], edges[i + 1]
+        nxt = slice(edges[i + 1], edges[i + 2]) if i + 2 < len(edges) else slice(size - 1, size)
+        avg_x, avg_y = x[nxt].mean(), y[nxt].mean()
+        area = np.abs((x[a] - avg_x) * (y[start:end] - y[a]) - (x[a] - x[start:end]) * (avg_y - y[a]))
+        a = start + int(area.argmax())
+        idx[i + 1] = a
+    return idx
+
+def series_key(series):
+    return hashlib.sha1(pd.util.hash_pandas_object(series[CHART_COLUMNS], index=False).values.tobytes()).hexdigest()
+
+@st.cache_data(max_entries=256, show_spinner=False)
+def _weight_figure(_series, key, max_points):
+    s = _series[CHART_COLUMNS].dropna()
+    x, y = pd.to_datetime(s["date_applied"]), s["weight"].astype(float).to_numpy()
+    if max_points and len(s) > max_points:
+        keep = lttb(x.to_numpy().astype("int64").astype(float), y, max_points)
+        x, y = x.iloc[keep], y[keep]
+    fig = go.Figure(); fig.add_trace(go.Scatter(x=x, y=y, mode='lines+markers', line=dict(color='#FF6B6B', width=3, shape='spline'), marker=dict(size=8, color='white', line=dict(color='#FF6B6B', width=2)), fill='tozeroy', fillcolor='rgba(255, 107, 107, 0.1)')); fig.update_layout(height=250, margin=dict(t=10,b=0,l=0,r=0), paper_bgcolor='rgba(0,0,0,0)', plot_bgcolor='rgba(0,0,0,0)', xaxis=dict(showgrid=False, showline=False, color="#718096"), yaxis=dict(showgrid=True, gridcolor='#E2E8F0', color="#718096"))
+    return fig.to_dict()
+
+def weight_figure(series, max_points=CHART_MAX_POINTS):
+    return _weight_figure(series, series_key(series), max_points)
@@ -0,0 +1,126 @@
+import os
+import streamlit as st
+import pandas as pd
+
+# --- DATA ACCESS ---
+# Per-user reads, cached across reruns (widget clicks, tab switches, language changes) and keyed
+# by user id. Every write path calls invalidate(user_id) right after it succeeds, so the next rerun
+# fetches fresh data; otherwise the TTL is only a safety net for writes made elsewhere.
+CACHE_TTL_SEC = 300
+
+# --- PROJECTIONS ---
+# Each view reads only the columns it renders. Free-text notes (and created_at / user_id) are
+# never part of the page payload; the history editor fetches them per pet when it is shown.
+# The notifier's projection is notifier.DUE_COLUMNS.
+PROFILE_COLUMNS = ["id", "email", "full_name", "secondary_email"]
+HOME_COLUMNS = ["id", "pet_name", "vaccine_type", "date_applied", "next_due_date"]  # one row per pet/vaccine, from vaccination_latest
+PET_COLUMNS = HOME_COLUMNS + ["weight"]  # profiles page: cards, general tab, dialog default weight
+CHART_COLUMNS = ["date_applied", "weight"]
+HISTORY_COLUMNS = ["id", "pet_name", "vaccine_type", "date_applied", "next_due_date", "weight", "notes"]
+PHOTO_COLUMNS = ["id", "pet_name", "photo_url", "thumb_url", "created_at"]  # photo_url only for the full-size view
+
+def _select(columns):
+    return ", ".join(columns)
+
+def frame(rows, columns):
+    return pd.DataFrame(rows or [], columns=columns)
+
+# --- LOCAL REPLICA ---
+# Set LOCAL_REPLICA_PATH (secret or env) to keep a SQLite copy of the user's rows (replica.py). A cache
+# miss then costs one delta sync request (rows changed since the last one) plus local indexed
+# queries instead of downloading everything again. Writes still go straight to Supabase.
+def _replica_path():
+    try: return st.secrets.get("LOCAL_REPLICA_PATH") or os.environ.get("LOCAL_REPLICA_PATH", "")
+    except Exception: return os.environ.get("LOCAL_REPLICA_PATH", "")
+
+@st.cache_resource(show_spinner=False)
+def _open_replica(path):
+    from replica import Replica
+    return Replica(path)
+
+def replica():
+    path = _replica_path()
+    return _open_replica(path) if path else None
+
+# One round trip per page: profile, vaccinations and photo metadata come back in a single payload
+# from the get_bootstrap() RPC (sql/004_bootstrap_rpc.sql, projected in sql/005, latest status in
+# sql/006, thumbnails in sql/007). Until that function is deployed we fall back to the three
+# separate queries.
+def _fetch_bootstrap(client, user_id):
+    rep = replica()
+    if rep is not None:
+        try:
+            rep.sync(client, user_id)
+            return {"profile": rep.profile(user_id, PROFILE_COLUMNS), "vaccinations": rep.vaccinations(user_id, PET_COLUMNS),
+                    "latest": rep.latest(user_id, HOME_COLUMNS), "photos": rep.photos(user_id, PHOTO_COLUMNS)}
+        except Exception:
+            pass  # replica_delta() not deployed (sql/008) or the sync failed: read from Supabase below
+    try:
+        return client.rpc("get_bootstrap").execute().data
+    except Exception:
+        profile = client.table("profiles").select(_select(PROFILE_COLUMNS)).eq("id", user_id).execute().data
+        return {
+            "profile": profile[0] if profile else None,
+            "vaccinations": client.table("vaccinations").select(_select(PET_COLUMNS)).eq("user_id", user_id).order("date_applied").execute().data,
+            "photos": client.table("pet_photos").select(_select(PHOTO_COLUMNS)).eq("user_id", user_id).order("created_at", desc=True).execute().data,
+        }
+
+# Latest dose per pet/vaccine. The database keeps this in vaccination_latest (sql/006); this is the
+# same rule for payloads that don't carry it yet, computed once per cache fill.
+def latest_status(vaccinations):
+    latest = vaccinations.sort_values(["date_applied", "id"], ascending=False).drop_duplicates(subset=["pet_name", "vaccine_type"], keep="first")
+    return latest[HOME_COLUMNS].sort_values("next_due_date").reset_index(drop=True)
+
+@st.cache_data(ttl=CACHE_TTL_SEC, show_spinner=False)
+def load_bootstrap(_client, user_id):
+    payload = _fetch_bootstrap(_client, user_id) or {}
+    vaccinations = frame(payload.get("vaccinations"), PET_COLUMNS)
+    latest = payload.get("latest")
+    return {
+        "profile": payload.get("profile") or {},
+        "vaccinations": vaccinations,
+        "latest": frame(latest, HOME_COLUMNS) if latest is not None else latest_status(vaccinations),
+        "photos": frame(payload.get("photos"), PHOTO_COLUMNS),
+    }
+
+# Full rows (with notes) for one pet's history editor.
+@st.cache_data(ttl=CACHE_TTL_SEC, show_spinner=False)
+def load_history(_client, user_id, pet_name):
+    rep = replica()
+    if rep is not None and rep.synced(user_id): return frame(rep.history(user_id, pet_name, HISTORY_COLUMNS), HISTORY_COLUMNS)
+    rows = _client.table("vaccinations").select(_select(HISTORY_COLUMNS)).eq("user_id", user_id).eq("pet_name", pet_name).order("date_applied").execute().data
+    return frame(rows, HISTORY_COLUMNS)
+
+# Token of the user's calendar feed URL (ics_feed.py, sql/009); None before the migration ran.
+@st.cache_data(ttl=CACHE_TTL_SEC, show_spinner=False)
+def load_calendar_token(_client, user_id):
+    try: rows = _client.table("profiles").select("calendar_token").eq("id", user_id).execute().data
+    except Exception: return None
+    return rows[0].get("calendar_token") if rows else None
+
+# --- DIFF SAVE ---
+# Editor saves send only what changed: rows without an id are inserts, rows whose values differ
+# from the loaded frame are updates, loaded ids missing from the edited frame are deletes.
+def _plain(v):
+    if v is None or (isinstance(v, float) and v != v): return None
+    if hasattr(v, "isoformat"): return v.isoformat()[:10]
+    return v.item() if hasattr(v, "item") else v
+
+def _records(df):
+    return [{k: _plain(v) for k, v in r.items()} for r in df.to_dict("records")]
+
+def diff_records(before, after, key="id"):
+    old = {int(r[key]): r for r in _records(before) if r.get(key) is not None}
+    inserts, updates, seen = [], [], set()
+    for r in _records(after):
+        if r.get(key) is None:
+            r.pop(key, None); inserts.append(r)
+            continue
+        r[key] = int(r[key]); seen.add(r[key])
+        if r != old.get(r[key]): updates.append(r)
+    return inserts, updates, [k for k in old if k not in seen]
+
+# pet=None -> profile/photo writes; pass the pet when its vaccinations changed.
+def invalidate(user_id, pet=None):
+    load_bootstrap.clear(None, user_id)
+    if pet is not None: load_history.clear(None, user_id, pet)
@@ -0,0 +1,121 @@
+from email.header import Header
+from email.mime.text import MIMEText
+from functools import lru_cache
+from string import Template
+
+# --- STATUS VARIANTS ---
+# Everything that only depends on the status bucket is baked into the templates once per run;
+# per message we only fill in names, dates and day counts.
+STATUSES = {
+    "overdue": {"color": "#D93025", "bg_color": "#FCE8E6", "header_tr": "GECİKTİ", "header_en": "OVERDUE",
+                "status_tr": "$days gün geçti", "status_en": "$days days overdue"},
+    "today": {"color": "#F9AB00", "bg_color": "#FEF7E0", "header_tr": "BUGÜN", "header_en": "TODAY",
+              "status_tr": "Bugün Yapılmalı", "status_en": "Due Today"},
+    "soon": {"color": "#E37400", "bg_color": "#FFF3E0", "header_tr": "AZ KALDI", "header_en": "SOON",
+             "status_tr": "$days gün kaldı", "status_en": "$days days left"},
+    "reminder": {"color": "#188038", "bg_color": "#E6F4EA", "header_tr": "HATIRLATMA", "header_en": "REMINDER",
+                 "status_tr": "$days gün kaldı", "status_en": "$days days left"},
+}
+
+def status_key(days_left):
+    if days_left < 0: return "overdue"
+    if days_left == 0: return "today"
+    if days_left <= 3: return "soon"
+    return "reminder"
+
+def clean_text(text):
+    if not text: return ""
+    return str(text).strip()
+
+def gcal_link(pet, vaccine, due_date):
+    start = due_date.replace("-","") + "T090000"
+    end = due_date.replace("-","") + "T091500"
+    return f"https://www.google.com/calendar/render?action=TEMPLATE&text={pet}-{vaccine}&dates={start}/{end}&details=PatiCheck&sf=true&output=xml"
+
+ALERT_HTML = """
+    <div style="font-family: Helvetica, Arial, sans-serif; max-width: 500px; margin: 0 auto; color: #333;">
+        <div style="border: 1px solid #e0e0e0; border-radius: 12px; overflow: hidden;">
+            <div style="background-color: {color}; padding: 15px; text-align: center; color: white;">
+                <h3 style="margin:0;">{header_tr} | {header_en}</h3>
+            </div>
+            <div style="padding: 25px; background-color: #ffffff;">
+                <p>$greeting</p>
+                <div style="text-align: center; margin: 25px 0;">
+                    <div style="font-size: 28px; font-weight: 900;">$pet</div>
+                    <div style="font-size: 20px; color: #555;">$vaccine</div>
+                </div>
+                <div style="background-color: {bg_color}; border-radius: 8px; padding: 15px; text-align: center;">
+                    <div style="font-weight: bold; color: {color};">{status_tr}</div>
+                    <div style="font-size: 12px; color: #666;">{status_en}</div>
+                    <div style="margin-top:5px; font-weight:bold; color:#333;">$due_date</div>
+                </div>
+                <div style="text-align: center; margin-top: 25px;">
+                    <a href="$gcal" style="background-color: {color}; color: white; padding: 12px 24px; text-decoration: none; border-radius: 6px; font-weight: bold; font-size: 14px;">📅 Takvime Ekle / Add to Calendar</a>
+                </div>
+            </div>
+        </div>
+        <p style="text-align: center; font-size: 11px; color: #aaa; margin-top: 20px;"><a href="{app_url}" style="color: #aaa;">PatiCheck App</a></p>
+    </div>
+    """
+
+DIGEST_ITEM_HTML = """
+                <div style="background-color: {bg_color}; border-radius: 8px; padding: 12px 15px; margin-bottom: 10px;">
+                    <div style="font-size: 11px; font-weight: bold; color: {color};">{header_tr} | {header_en}</div>
+                    <div style="font-size: 18px; font-weight: 900;">$pet <span style="font-weight: normal; color: #555;">- $vaccine</span></div>
+                    <div style="font-size: 13px;"><b style="color: {color};">{status_tr}</b> <span style="color: #666;">/ {status_en}</span> &middot; <b>$due_date</b></div>
+                    <div style="margin-top: 6px; font-size: 12px;"><a href="$gcal" style="color: {color};">📅 Takvime Ekle / Add to Calendar</a></div>
+                </div>"""
+
+DIGEST_HTML = """
+    <div style="font-family: Helvetica, Arial, sans-serif; max-width: 500px; margin: 0 auto; color: #333;">
+        <div style="border: 1px solid #e0e0e0; border-radius: 12px; overflow: hidden;">
+            <div style="background-color: {color}; padding: 15px; text-align: center; color: white;">
+                <h3 style="margin:0;">$count AŞI | $count VACCINES</h3>
+            </div>
+            <div style="padding: 25px; background-color: #ffffff;">
+                <p>$greeting</p>$items
+            </div>
+        </div>
+        <p style="text-align: center; font-size: 11px; color: #aaa; margin-top: 20px;"><a href="{app_url}" style="color: #aaa;">PatiCheck App</a></p>
+    </div>
+    """
+
+# --- RENDERER ---
+# Built once per run. render() takes a recipient name and a tuple of
+# (pet, vaccine, due_date, days_left) items and returns (subject, headers, mime_body). Results are cached,
+# so a household's primary and secondary address share one rendered and encoded body;
+# message() only prepends the per-recipient headers.
+class Renderer:
+    def __init__(self, app_url, sender, cache_size=1024):
+        def compile(html, style):
+            return Template(html.format(app_url=app_url, **style))
+        self.alert = {k: compile(ALERT_HTML, s) for k, s in STATUSES.items()}
+        self.digest_item = {k: compile(DIGEST_ITEM_HTML, s) for k, s in STATUSES.items()}
+        self.digest = {k: compile(DIGEST_HTML, s) for k, s in STATUSES.items()}
+        self.from_header = f"From: PatiCheck <{sender}>\n"
+        self.render = lru_cache(maxsize=cache_size)(self._render)
+
+    def _fields(self, item):
+        pet, vaccine, due_date, days_left = item
+        pet, vaccine = clean_text(pet), clean_text(vaccine)
+        return {"pet": pet, "vaccine": vaccine, "due_date": due_date, "days": abs(days_left), "gcal": gcal_link(pet, vaccine, due_date)}
+
+    def _render(self, name, items):
+        greeting = f"Merhaba {name}," if name else "Merhaba / Hello,"
+        if len(items) == 1:
+            fields = self._fields(items[0])
+            subject = f"PatiCheck: {fields['pet']} - {fields['vaccine']}"
+            html = self.alert[status_key(items[0][3])].substitute(fields, greeting=greeting)
+        else:
+            # One email per household: every due pet/vaccine in a single list, most urgent first.
+            items = sorted(items, key=lambda it: it[3])
+            rows_html = "".join(self.digest_item[status_key(it[3])].substitute(self._fields(it)) for it in items)
+            subject = f"PatiCheck: {len(items)} hatırlatma / reminders"
+            html = self.digest[status_key(items[0][3])].substitute(greeting=greeting, count=len(items), items=rows_html)
+        body = MIMEText(html, "html", "utf-8").as_string()
+        encoded_subject = subject if subject.isascii() else Header(subject, "utf-8").encode()
+        return subject, f"Subject: {encoded_subject}\n" + self.from_header, body
+
+    def message(self, rendered, to_email):
+        subject, headers, body = rendered
+        return f"{headers}To: {to_email}\n{body}"
@@ -0,0 +1,190 @@
+import hashlib
+import os
+import re
+import threading
+import time
+from collections import OrderedDict
+from datetime import date, datetime, timedelta, timezone
+from email.utils import format_datetime, parsedate_to_datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# --- CALENDAR FEED ---
+# Serves GET /calendar/<calendar_token>.ics: one all-day event per pet/vaccine at its latest
+# next_due_date (vaccination_latest, sql/006), so calendar apps subscribe once instead of users adding
+# the reminder emails' one-off Google Calendar links every cycle.
+# Built feeds are kept in memory with an ETag and Last-Modified; clients polling with If-None-Match /
+# If-Modified-Since get a 304 without touching the database. Every FEED_REFRESH_SEC one query on
+# calendar_feed_changes (sql/009) lists the users whose latest rows changed, and only cached feeds of
+# those users are rebuilt.
+#   SUPABASE_URL=... SUPABASE_SERVICE_KEY=... python ics_feed.py
+FEED_PORT = int(os.environ.get("PORT", "8080"))
+FEED_REFRESH_SEC = int(os.environ.get("FEED_REFRESH_SEC", "60"))
+FEED_CACHE_SIZE = int(os.environ.get("FEED_CACHE_SIZE", "10000"))
+PAGE_SIZE = 1000
+FEED_COLUMNS = "user_id, pet_name, vaccine_type, next_due_date"
+PATH_RE = re.compile(r"^/calendar/([0-9A-Za-z_-]{16,64})\.ics$")
+
+# --- ICS ---
+def _escape(text):
+    return str(text).replace("\\", "\\\\").replace(";", "\\;").replace(",", "\\,").replace("\r", "").replace("\n", "\\n")
+
+# RFC 5545: content lines longer than 75 octets continue on the next line after a single space.
+def _fold(line):
+    raw = line.encode("utf-8")
+    if len(raw) <= 75: return line
+    parts, start = [], 0
+    while start < len(raw):
+        end = min(start + (75 if not parts else 74), len(raw))
+        while end < len(raw) and (raw[end] & 0xC0) == 0x80: end -= 1  # don't split a UTF-8 sequence
+        parts.append(raw[start:end].decode("utf-8")); start = end
+    return "\r\n ".join(parts)
+
+# One UID per (user, pet, vaccine): a new dose moves the existing event instead of adding another.
+def event(user_id, pet, vaccine, due, stamp):
+    day = date.fromisoformat(due)
+    uid = hashlib.sha1(f"{user_id}|{pet}|{vaccine}".encode("utf-8")).hexdigest()
+    lines = [
+        "BEGIN:VEVENT", f"UID:{uid}@paticheck", f"DTSTAMP:{stamp}",
+        f"DTSTART;VALUE=DATE:{day:%Y%m%d}", f"DTEND;VALUE=DATE:{day + timedelta(days=1):%Y%m%d}",
+        f"SUMMARY:{_escape(f'{pet} - {vaccine}')}", "DESCRIPTION:PatiCheck", "TRANSP:TRANSPARENT",
+        "BEGIN:VALARM", "ACTION:DISPLAY", f"DESCRIPTION:{_escape(f'{pet} - {vaccine}')}", "TRIGGER:-P1D", "END:VALARM",
+        "END:VEVENT",
+    ]
+    return "\r\n".join(_fold(l) for l in lines)
+
+def feed_key(rows):
+    return tuple(sorted((r["next_due_date"], r["pet_name"], r["vaccine_type"]) for r in rows if r.get("next_due_date")))
+
+def build_ics(user_id, key, modified):
+    stamp = f"{modified:%Y%m%dT%H%M%SZ}"
+    head = ["BEGIN:VCALENDAR", "VERSION:2.0", "PRODID:-//PatiCheck//Vaccination Calendar//EN", "CALSCALE:GREGORIAN",
+            "METHOD:PUBLISH", "X-WR-CALNAME:PatiCheck", "REFRESH-INTERVAL;VALUE=DURATION:PT12H", "X-PUBLISHED-TTL:PT12H"]
+    events = [event(user_id, pet, vaccine, due, stamp) for due, pet, vaccine in key]
+    return ("\r\n".join(head + events + ["END:VCALENDAR"]) + "\r\n").encode("utf-8")
+
+# --- CACHE ---
+class Feed:
+    def __init__(self, user_id, rows, modified):
+        self.user_id, self.key = user_id, feed_key(rows)
+        self.body = build_ics(user_id, self.key, modified)
+        self.etag = '"' + hashlib.sha1(self.body).hexdigest() + '"'
+        self.modified = modified.replace(microsecond=0)
+        self.last_modified = format_datetime(self.modified, usegmt=True)
+
+class FeedCache:
+    def __init__(self, client, max_size=FEED_CACHE_SIZE):
+        self.client, self.max_size = client, max_size
+        self.feeds = OrderedDict()  # token -> Feed, least recently requested first
+        self.tokens = {}            # user_id -> token
+        self.lock = threading.Lock()
+        self.watermark, self.seen = None, set()  # seen: users already handled at exactly the watermark
+        self.queries = 0
+
+    def _latest(self, user_ids):
+        rows, start = [], 0
+        while True:
+            page = self.client.table("vaccination_latest").select(FEED_COLUMNS).in_("user_id", user_ids).order("user_id").order("vaccination_id").range(start, start + PAGE_SIZE - 1).execute().data
+            self.queries += 1; rows += page
+            if len(page) < PAGE_SIZE: return rows
+            start += PAGE_SIZE
+
+    def _store(self, token, feed):
+        with self.lock:
+            self.feeds[token] = feed; self.feeds.move_to_end(token); self.tokens[feed.user_id] = token
+            while len(self.feeds) > self.max_size:
+                _, old = self.feeds.popitem(last=False); self.tokens.pop(old.user_id, None)
+
+    # Cache hit: no query. Miss: token lookup + the user's latest rows.
+    def get(self, token):
+        with self.lock:
+            feed = self.feeds.get(token)
+            if feed is not None: self.feeds.move_to_end(token); return feed
+        profile = self.client.table("profiles").select("id").eq("calendar_token", token).limit(1).execute().data; self.queries += 1
+        if not profile: return None
+        user_id, now = profile[0]["id"], datetime.now(timezone.utc)
+        feed = Feed(user_id, self._latest([user_id]), now)
+        self._store(token, feed)
+        return feed
+
+    # One query when nothing changed; rebuilds only cached users that did. Returns the number rebuilt.
+    def refresh(self):
+        query = self.client.table("calendar_feed_changes").select("user_id, changed_at").order("changed_at")
+        if self.watermark: query = query.gte("changed_at", self.watermark)  # >=: a change sharing the watermark's timestamp isn't missed
+        changes = query.execute().data; self.queries += 1
+        fresh = [c for c in changes if not (c["changed_at"] == self.watermark and c["user_id"] in self.seen)]
+        if not fresh: return 0
+        if changes[-1]["changed_at"] != self.watermark: self.watermark, self.seen = changes[-1]["changed_at"], set()
+        self.seen.update(c["user_id"] for c in changes if c["changed_at"] == self.watermark)
+        with self.lock: users = list({c["user_id"] for c in fresh if c["user_id"] in self.tokens})
+        if not users: return 0
+        rows = {u: [] for u in users}
+        for start in range(0, len(users), 100):  # keep the in.(...) filter inside URL limits
+            for r in self._latest(users[start:start + 100]): rows[r["user_id"]].append(r)
+        rebuilt = 0
+        for user_id in users:
+            with self.lock: token = self.tokens.get(user_id)
+            if token is None: continue  # evicted meanwhile
+            with self.lock: old = self.feeds.get(token)
+            if old is not None and old.key == feed_key(rows[user_id]): continue  # e.g. a notes edit: keep the validators clients already hold
+            self._store(token, Feed(user_id, rows[user_id], datetime.now(timezone.utc)))
+            rebuilt += 1
+        return rebuilt
+
+    def start_refresher(self, interval=FEED_REFRESH_SEC):
+        self.watermark = self.watermark or datetime.now(timezone.utc).isoformat()
+        def loop():
+            while True:
+                time.sleep(interval)
+                try:
+                    n = self.refresh()
+                    if n: print(f"🔄 Rebuilt {n} calendar feeds")
+                except Exception as e: print(f"⚠️ Feed refresh failed: {e}")
+        threading.Thread(target=loop, daemon=True).start()
+
+# --- HTTP ---
+def not_modified(feed, headers):
+    if headers.get("If-None-Match"):
+        return feed.etag in [t.strip() for t in headers["If-None-Match"].split(",")] or headers["If-None-Match"].strip() == "*"
+    if headers.get("If-Modified-Since"):
+        try: return parsedate_to_datetime(headers["If-Modified-Since"]) >= feed.modified
+        except (TypeError, ValueError): return False
+    return False
+
+def make_handler(cache):
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def do_GET(self, body=True):
+            match = PATH_RE.match(self.path.split("?", 1)[0])
+            feed = cache.get(match.group(1)) if match else None
+            if feed is None:
+                self.send_response(404); self.send_header("Content-Length", "0"); self.end_headers(); return
+            status = 304 if not_modified(feed, self.headers) else 200
+            self.send_response(status)
+            self.send_header("ETag", feed.etag); self.send_header("Last-Modified", feed.last_modified)
+            self.send_header("Cache-Control", f"private, max-age={FEED_REFRESH_SEC}")
+            if status == 200:
+                self.send_header("Content-Type", "text/calendar; charset=utf-8"); self.send_header("Content-Length", str(len(feed.body)))
+            self.end_headers()
+            if status == 200 and body: self.wfile.write(feed.body)
+
+        def do_HEAD(self): self.do_GET(body=False)
+
+        def log_message(self, fmt, *args): pass
+
+    return Handler
+
+def main():
+    from supabase import create_client
+    try:
+        supabase = create_client(os.environ["SUPABASE_URL"], os.environ["SUPABASE_SERVICE_KEY"])
+    except KeyError as e:
+        print(f"❌ Missing Secret: {e}")
+        exit(1)
+    cache = FeedCache(supabase); cache.start_refresher()
+    server = ThreadingHTTPServer(("", FEED_PORT), make_handler(cache))
+    print(f"📅 Calendar feeds on :{FEED_PORT}/calendar/<token>.ics")
+    server.serve_forever()
+
+if __name__ == "__main__":
+    main()
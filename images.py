@@ -0,0 +1,87 @@
+import hashlib
+import io
+from concurrent.futures import ThreadPoolExecutor
+from PIL import Image, ImageOps
+
+# --- IMAGE PIPELINE ---
+# Phone photos are 12 MP and up, but the app never shows more than a DISPLAY_SIZE square. JPEGs are
+# decoded straight at a reduced DCT scale (draft), and the crop + downscale is a single resize with
+# reducing_gap (integer reduce() first, then a short bilinear pass; after draft the remaining ratio
+# is under 2, where bilinear looks the same as bicubic), so the full-size bitmap is never built,
+# cropped or filtered. The thumbnail is made from the display image, not the original.
+# What is left is the entropy decode of the JPEG itself: draft skips the inverse DCT work, not the
+# Huffman pass, so that cost grows with the file size and cannot be cut here.
+DISPLAY_SIZE = 1080
+THUMB_SIZE = 256
+JPEG_QUALITY = 80
+THUMB_QUALITY = 75
+BUCKET = "pet-photos"
+ORIENTATION = 0x0112  # EXIF tag
+
+def _encode(img, quality):
+    buf = io.BytesIO()
+    img.save(buf, format="JPEG", quality=quality)
+    return buf.getvalue()
+
+# data: raw upload bytes (or a file object) -> the normalized display image (RGB, at most size x size)
+def normalize(data, size=DISPLAY_SIZE):
+    img = Image.open(io.BytesIO(data) if isinstance(data, bytes) else data)
+    img.draft("RGB", (size, size))  # JPEG only: decode at 1/2, 1/4 or 1/8 scale, never below `size`
+    if img.getexif().get(ORIENTATION, 1) != 1: img = ImageOps.exif_transpose(img)  # otherwise it is a full copy for nothing
+    if img.mode != "RGB": img = img.convert("RGB")
+
+    # Center square crop, applied as the resize source box.
+    w, h = img.size
+    side = min(w, h)
+    box = ((w - side) / 2, (h - side) / 2, (w + side) / 2, (h + side) / 2)
+    out = min(side, size)
+    return img.resize((out, out), Image.BILINEAR, box=box, reducing_gap=2.0)
+
+# Hash of the normalized pixels: the same picture re-sent from another device, under another file
+# name or with other metadata gets the same key, and it is known before anything is encoded.
+def content_hash(display):
+    return hashlib.sha256(f"{display.size}".encode() + display.tobytes()).hexdigest()[:32]
+
+# display image -> (display JPEG bytes, thumbnail JPEG bytes)
+def encode(display, thumb_size=THUMB_SIZE):
+    out = display.size[0]
+    thumb = display.resize((min(out, thumb_size),) * 2, Image.LANCZOS, reducing_gap=2.0)  # 1080 -> reduce(2) -> 256
+    return _encode(display, JPEG_QUALITY), _encode(thumb, THUMB_QUALITY)
+
+# data: raw upload bytes (or a file object) -> (display JPEG bytes, thumbnail JPEG bytes)
+def prepare(data, size=DISPLAY_SIZE, thumb_size=THUMB_SIZE):
+    return encode(normalize(data, size), thumb_size)
+
+# Thumbnails live next to the display image: {user}/{pet}/thumbs/{name}.jpg
+def thumb_path(path):
+    folder, name = path.rsplit("/", 1)
+    return f"{folder}/thumbs/{name}"
+
+# Content-addressed: {user}/{pet}/{content_hash}.jpg never changes once written.
+def photo_paths(user_id, pet_key, digest):
+    path = f"{user_id}/{pet_key}/{digest}.jpg"
+    return path, thumb_path(path)
+
+# Public URL -> object path inside the bucket.
+def storage_path(url):
+    return url.split(f"/{BUCKET}/", 1)[1].split("?", 1)[0]
+
+# immutable: content-addressed objects are cached for a year (Storage takes max-age seconds only).
+IMMUTABLE_MAX_AGE = "31536000"
+
+def upload(client, path, data, upsert=False, immutable=False):
+    bucket = client.storage.from_(BUCKET)
+    options = {"content-type": "image/jpeg"}
+    if upsert: options["upsert"] = "true"
+    if immutable: options["cache-control"] = IMMUTABLE_MAX_AGE
+    bucket.upload(path, data, options)
+    return bucket.get_public_url(path)
+
+# --- BACKGROUND UPLOADS ---
+# Decode, encode and storage uploads run here instead of inside the Streamlit script run; the page
+# only holds on to the Future. One pool per process, shared by every session.
+UPLOAD_WORKERS = 2
+_executor = ThreadPoolExecutor(max_workers=UPLOAD_WORKERS, thread_name_prefix="photo-upload")
+
+def submit(fn, *args, **kwargs):
+    return _executor.submit(fn, *args, **kwargs)
@@ -0,0 +1,85 @@
+import json
+import os
+import threading
+
+# --- SEND LEDGER ---
+# One entry per delivered reminder, keyed by (vaccination_id, due_date, notify_offset, recipient).
+# The notifier skips keys that are already present, so re-running a day is a cheap no-op and a
+# late or repeated cron tick only sends what is still missing.
+# Slots of the send window (wakeup.py) whose run finished cleanly are recorded too, so later ticks
+# of the same day don't query them again.
+
+def ledger_key(vaccination_id, due_date, offset, recipient):
+    return (str(vaccination_id), str(due_date), int(offset), recipient.strip().lower())
+
+class SupabaseLedger:
+    def __init__(self, client, table="notification_log", slot_table="notification_slots", chunk=200):
+        self.client = client
+        self.table = table
+        self.slot_table = slot_table
+        self.chunk = chunk
+
+    def sent_keys(self, vaccination_ids):
+        ids = list(dict.fromkeys(vaccination_ids))
+        keys = set()
+        for i in range(0, len(ids), self.chunk):
+            res = self.client.table(self.table).select("vaccination_id, due_date, notify_offset, recipient").in_("vaccination_id", ids[i:i + self.chunk]).execute()
+            keys.update(ledger_key(r["vaccination_id"], r["due_date"], r["notify_offset"], r["recipient"]) for r in res.data)
+        return keys
+
+    def record(self, keys):
+        rows = [{"vaccination_id": k[0], "due_date": k[1], "notify_offset": k[2], "recipient": k[3]} for k in keys]
+        if not rows: return
+        # Called from every dispatcher worker; no lock, the upserts are independent and the client is thread-safe.
+        self.client.table(self.table).upsert(rows, on_conflict="vaccination_id,due_date,notify_offset,recipient", ignore_duplicates=True).execute()
+
+    # Empty until sql/011 is deployed: every earlier slot is then re-checked, as before.
+    def done_slots(self, day):
+        try: return {r["slot"] for r in self.client.table(self.slot_table).select("slot").eq("send_day", str(day)).execute().data}
+        except Exception: return set()
+
+    def record_slots(self, day, slots):
+        rows = [{"send_day": str(day), "slot": s} for s in slots]
+        if rows: self.client.table(self.slot_table).upsert(rows, on_conflict="send_day,slot", ignore_duplicates=True).execute()
+
+# Local stand-in (JSON lines), e.g. for dry runs or when the table is not available.
+class FileLedger:
+    def __init__(self, path):
+        self.path = path
+        self.lock = threading.Lock()
+        self.by_id = {}  # vaccination_id -> set of keys
+        self.slots = set()  # (send_day, slot), stored as {"send_day": ..., "slot": ...} lines
+        if os.path.exists(path):
+            with open(path, encoding="utf-8") as f:
+                for line in f:
+                    if not line.strip(): continue
+                    entry = json.loads(line)
+                    if isinstance(entry, dict): self.slots.add((entry["send_day"], entry["slot"]))
+                    else: self._add(tuple(entry))
+
+    def _add(self, key):
+        seen = self.by_id.setdefault(key[0], set())
+        if key in seen: return False
+        seen.add(key)
+        return True
+
+    def sent_keys(self, vaccination_ids):
+        keys = set()
+        for i in vaccination_ids: keys |= self.by_id.get(str(i), set())
+        return keys
+
+    def record(self, keys):
+        with self.lock:
+            with open(self.path, "a", encoding="utf-8") as f:
+                for k in keys:
+                    if self._add(k): f.write(json.dumps(k) + "\n")
+
+    def done_slots(self, day):
+        return {s for d, s in self.slots if d == str(day)}
+
+    def record_slots(self, day, slots):
+        with self.lock:
+            with open(self.path, "a", encoding="utf-8") as f:
+                for s in slots:
+                    if (str(day), s) not in self.slots:
+                        self.slots.add((str(day), s)); f.write(json.dumps({"send_day": str(day), "slot": s}) + "\n")
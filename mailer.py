@@ -0,0 +1,207 @@
+import random
+import smtplib
+import threading
+import time
+from queue import Queue, Empty
+
+# --- RATE LIMITER ---
+# Classic token bucket: `rate` tokens per second, up to `burst` saved up.
+# A rate of 0 (or less) disables pacing entirely.
+class TokenBucket:
+    def __init__(self, rate, burst=1):
+        self.rate = float(rate)
+        self.capacity = max(1.0, float(burst))
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+
+    def acquire(self):
+        if self.rate <= 0: return
+        while True:
+            with self.lock:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                wait = (1 - self.tokens) / self.rate
+            time.sleep(wait)
+
+# --- SMTP POOL ---
+# Keeps up to `size` authenticated connections open and hands them out per send,
+# so a run pays for the TLS handshake + login once per connection instead of once per email.
+# With `stats` (runstats.RunStats) every connect/login/send is timed as an SMTP op.
+class SMTPPool:
+    def __init__(self, user, password, host="smtp.gmail.com", port=465, size=1, rate=1.0, burst=1, timeout=30, connect=None, stats=None):
+        self.stats = stats
+        self.user = user
+        self.password = password
+        self.connect = connect or (lambda: smtplib.SMTP_SSL(host, port, timeout=timeout))
+        self.bucket = TokenBucket(rate, burst)
+        self.idle = Queue()
+        self.slots = threading.Semaphore(max(1, int(size)))
+
+    def _timed(self, op, fn, *args):
+        if self.stats is None: return fn(*args)
+        t = time.perf_counter()
+        try:
+            return fn(*args)
+        finally:
+            self.stats.observe(op, time.perf_counter() - t)
+
+    def _open(self):
+        conn = self._timed("connect", self.connect)
+        try:
+            self._timed("login", conn.login, self.user, self.password)
+        except Exception:
+            self._discard(conn)
+            raise
+        return conn
+
+    def _discard(self, conn):
+        try: conn.quit()
+        except Exception:
+            try: conn.close()
+            except Exception: pass
+
+    def _checkout(self):
+        self.slots.acquire()
+        try:
+            return self.idle.get_nowait()
+        except Empty:
+            try: return self._open()
+            except Exception:
+                self.slots.release()
+                raise
+
+    def _checkin(self, conn):
+        if conn is not None: self.idle.put(conn)
+        self.slots.release()
+
+    def send(self, to_addrs, msg):
+        self._timed("rate_limit_wait", self.bucket.acquire)
+        conn = self._checkout()
+        try:
+            try:
+                self._timed("send", conn.sendmail, self.user, to_addrs, msg)
+            except smtplib.SMTPServerDisconnected:
+                # Server dropped an idle connection (Gmail does this after a while) -> reconnect once.
+                self._discard(conn)
+                conn = None
+                if self.stats: self.stats.count("smtp_reconnects")
+                conn = self._open()
+                self._timed("send", conn.sendmail, self.user, to_addrs, msg)
+        except smtplib.SMTPResponseException:
+            # The server answered, so the session itself is still usable.
+            self._checkin(conn)
+            raise
+        except Exception:
+            if conn is not None: self._discard(conn)
+            self._checkin(None)
+            raise
+        self._checkin(conn)
+
+    def close(self):
+        while True:
+            try: conn = self.idle.get_nowait()
+            except Empty: break
+            self._discard(conn)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+# --- LOCAL SINK ---
+# Drop-in for smtplib.SMTP_SSL when nothing should leave the machine (dry runs, benchmarks):
+# SMTPPool(..., connect=lambda: SinkSMTP(sink)). `latency` simulates a network round trip per send.
+class SinkSMTP:
+    def __init__(self, sink=None, latency=0.0):
+        self.sink = sink if sink is not None else []
+        self.latency = latency
+
+    def login(self, user, password):
+        pass
+
+    def sendmail(self, from_addr, to_addrs, msg):
+        if self.latency: time.sleep(self.latency)
+        self.sink.append((to_addrs, len(msg)))
+        return {}
+
+    def quit(self):
+        pass
+
+    close = quit
+
+# --- CONCURRENT DELIVERY ---
+def is_transient(exc):
+    if isinstance(exc, smtplib.SMTPRecipientsRefused):
+        return all(400 <= code < 500 for code, _ in exc.recipients.values())
+    if isinstance(exc, smtplib.SMTPResponseException):
+        return 400 <= exc.smtp_code < 500
+    if isinstance(exc, smtplib.SMTPServerDisconnected):
+        return True
+    if isinstance(exc, smtplib.SMTPException):
+        return False
+    return isinstance(exc, OSError)  # socket errors, timeouts, refused connections
+
+# Worker threads pull rendered messages off a bounded queue and send them through the pool.
+# Temporary failures are retried with exponential backoff + full jitter, permanent ones are
+# collected in `failures` as (to, tag, error) for the end-of-run report.
+# `on_sent(to, tag)` runs on the worker thread right after a successful send.
+class Dispatcher:
+    def __init__(self, pool, workers=4, retries=3, backoff=2.0, max_backoff=60.0, on_sent=None, verbose=True, stats=None):
+        self.stats = stats
+        self.pool = pool
+        self.on_sent = on_sent
+        self.verbose = verbose
+        self.retries = retries
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.queue = Queue(maxsize=max(1, workers) * 4)
+        self.lock = threading.Lock()
+        self.sent = 0
+        self.failures = []
+        self.threads = [threading.Thread(target=self._work, daemon=True) for _ in range(max(1, workers))]
+        for t in self.threads: t.start()
+
+    def submit(self, to, msg, tag=None):
+        self.queue.put((to, msg, tag))
+
+    def _deliver(self, to, msg, tag):
+        attempt = 0
+        while True:
+            try:
+                self.pool.send(to, msg)
+            except Exception as e:
+                if attempt >= self.retries or not is_transient(e):
+                    print(f"❌ Error sending to {to}: {e}")
+                    with self.lock: self.failures.append((to, tag, e))
+                    return
+                delay = random.uniform(0, min(self.max_backoff, self.backoff * 2 ** attempt))
+                attempt += 1
+                if self.stats: self.stats.count("retries")
+                print(f"🔁 Retry {attempt}/{self.retries} for {to} in {delay:.1f}s ({e})")
+                time.sleep(delay)
+                continue
+            if self.verbose: print(f"✅ Sent email to {to}")
+            with self.lock: self.sent += 1
+            if self.on_sent:
+                try: self.on_sent(to, tag)
+                except Exception as e: print(f"⚠️ Sent to {to} but could not record it: {e}")
+            return
+
+    def _work(self):
+        while True:
+            job = self.queue.get()
+            try:
+                if job is None: return
+                self._deliver(*job)
+            finally:
+                self.queue.task_done()
+
+    def close(self):
+        for _ in self.threads: self.queue.put(None)
+        for t in self.threads: t.join()
@@ -1,168 +1,190 @@
 import os
-import smtplib
-from email.mime.text import MIMEText
-from email.mime.multipart import MIMEMultipart
-from supabase import create_client
-from datetime import date, datetime
-import requests
-import time
+from datetime import datetime, timedelta
+from mailer import SMTPPool, Dispatcher, is_transient
+from ledger import SupabaseLedger, FileLedger, ledger_key
+from email_templates import Renderer
+from runstats import RunStats
+from wakeup import APP_URL, EMAIL_HOUR_UTC, SEND_WINDOW_HOURS, is_email_time, send_day, due_slots, buckets_for
 
 # --- CONFIGURATION ---
-# GitHub Servers run in UTC. 
-# 06:00 UTC = 09:00 TRT (Turkey Time)
-EMAIL_HOUR_UTC = 6 
-
-# --- 1. WAKE UP CALL (ALWAYS RUNS) ---
-APP_URL = os.environ.get("APP_URL", "https://paticheck.streamlit.app")
-print(f"⏰ Tick Tock... It is {datetime.utcnow().strftime('%H:%M')} UTC.")
-print(f"Pinging {APP_URL}...")
-try:
-    requests.get(APP_URL, timeout=10)
-    print("✅ Ping success. App is awake.")
-except Exception as e:
-    print(f"⚠️ Ping failed: {e}")
-
-# --- 2. TIME CHECK ---
-current_hour = datetime.utcnow().hour
-if current_hour != EMAIL_HOUR_UTC:
-    print(f"💤 Not email time yet (Target: {EMAIL_HOUR_UTC}:00 UTC). Going back to sleep.")
-    exit(0) # STOP HERE if it's not 9:00 AM TRT
-
-print("🔔 It is Email Time! Checking database...")
-
-# --- 3. DATABASE SETUP (Only runs at 09:00 TRT) ---
-try:
-    SUPA_URL = os.environ["SUPABASE_URL"]
-    SUPA_KEY = os.environ["SUPABASE_SERVICE_KEY"] 
-    supabase = create_client(SUPA_URL, SUPA_KEY)
-
-    SMTP_USER = os.environ["EMAIL_USER"]
-    SMTP_PASS = os.environ["EMAIL_PASS"]
-except KeyError as e:
-    print(f"❌ Missing Secret: {e}")
-    exit(1)
-
-def clean_text(text):
-    if not text: return ""
-    return str(text).strip()
-
-def send_alert(to_email, name, pet, vaccine, due_date, days_left):
-    print(f"🚀 Sending to {to_email}...")
-    
-    pet_clean = clean_text(pet)
-    vaccine_clean = clean_text(vaccine)
-    greeting = f"Merhaba {name}," if name else "Merhaba / Hello,"
-    
-    start = due_date.replace("-","") + "T090000"
-    end = due_date.replace("-","") + "T091500"
-    gcal_link = f"https://www.google.com/calendar/render?action=TEMPLATE&text={pet_clean}-{vaccine_clean}&dates={start}/{end}&details=PatiCheck&sf=true&output=xml"
-    
-    if days_left < 0:
-        color = "#D93025" 
-        bg_color = "#FCE8E6"
-        header_tr, header_en = "GECİKTİ", "OVERDUE"
-        status_tr = f"{abs(days_left)} gün geçti"
-        status_en = f"{abs(days_left)} days overdue"
-        intro_tr = "Bu aşı tarihi geçmiş durumda."
-        intro_en = "This vaccination is past due."
-    elif days_left == 0:
-        color = "#F9AB00"
-        bg_color = "#FEF7E0"
-        header_tr, header_en = "BUGÜN", "TODAY"
-        status_tr, status_en = "Bugün Yapılmalı", "Due Today"
-        intro_tr = "Aşı günü geldi çattı!"
-        intro_en = "Vaccination day is here!"
-    elif days_left <= 3:
-        color = "#E37400"
-        bg_color = "#FFF3E0"
-        header_tr, header_en = "AZ KALDI", "SOON"
-        status_tr = f"{days_left} gün kaldı"
-        status_en = f"{days_left} days left"
-        intro_tr = "Veteriner zamanı yaklaşıyor."
-        intro_en = "Vet time is approaching."
-    else:
-        color = "#188038"
-        bg_color = "#E6F4EA"
-        header_tr, header_en = "HATIRLATMA", "REMINDER"
-        status_tr = f"{days_left} gün kaldı"
-        status_en = f"{days_left} days left"
-        intro_tr = "Önümüzdeki hafta için hatırlatma."
-        intro_en = "Reminder for the upcoming week."
-
-    msg = MIMEMultipart()
-    msg['Subject'] = f"PatiCheck: {pet_clean} - {vaccine_clean}"
-    msg['From'] = f"PatiCheck <{SMTP_USER}>"
-    msg['To'] = to_email
-    
-    html = f"""
-    <div style="font-family: Helvetica, Arial, sans-serif; max-width: 500px; margin: 0 auto; color: #333;">
-        <div style="border: 1px solid #e0e0e0; border-radius: 12px; overflow: hidden;">
-            <div style="background-color: {color}; padding: 15px; text-align: center; color: white;">
-                <h3 style="margin:0;">{header_tr} | {header_en}</h3>
-            </div>
-            <div style="padding: 25px; background-color: #ffffff;">
-                <p>{greeting}</p>
-                <div style="text-align: center; margin: 25px 0;">
-                    <div style="font-size: 28px; font-weight: 900;">{pet_clean}</div>
-                    <div style="font-size: 20px; color: #555;">{vaccine_clean}</div>
-                </div>
-                <div style="background-color: {bg_color}; border-radius: 8px; padding: 15px; text-align: center;">
-                    <div style="font-weight: bold; color: {color};">{status_tr}</div>
-                    <div style="font-size: 12px; color: #666;">{status_en}</div>
-                    <div style="margin-top:5px; font-weight:bold; color:#333;">{due_date}</div>
-                </div>
-                <div style="text-align: center; margin-top: 25px;">
-                    <a href="{gcal_link}" style="background-color: {color}; color: white; padding: 12px 24px; text-decoration: none; border-radius: 6px; font-weight: bold; font-size: 14px;">📅 Takvime Ekle / Add to Calendar</a>
-                </div>
-            </div>
-        </div>
-        <p style="text-align: center; font-size: 11px; color: #aaa; margin-top: 20px;"><a href="{APP_URL}" style="color: #aaa;">PatiCheck App</a></p>
-    </div>
-    """
-    msg.attach(MIMEText(html, 'html'))
-    
+# Email hour and APP_URL live in wakeup.py (the stdlib-only cron entry point).
+# Unset -> notification_log table in Supabase. Set to a file path for a local JSON-lines ledger.
+LEDGER_PATH = os.environ.get("LEDGER_PATH", "")
+# Machine-readable timings/counters for each run (uploaded as a workflow artifact). Empty -> off.
+RUN_REPORT_PATH = os.environ.get("RUN_REPORT_PATH", "run_report.json")
+
+# SMTP pacing: token bucket instead of a fixed sleep. Raise these up to the provider's quota.
+SMTP_RATE_PER_SEC = float(os.environ.get("SMTP_RATE_PER_SEC", "1"))
+SMTP_BURST = int(os.environ.get("SMTP_BURST", "5"))
+# Concurrent delivery: each worker holds one pooled connection. Temporary SMTP errors are
+# retried with exponential backoff, permanent ones are listed at the end of the run.
+SMTP_WORKERS = int(os.environ.get("SMTP_WORKERS", "4"))
+SMTP_RETRIES = int(os.environ.get("SMTP_RETRIES", "3"))
+SMTP_BACKOFF_SEC = float(os.environ.get("SMTP_BACKOFF_SEC", "2"))
+
+NOTIFY_DAYS = [7, 3, 1, 0, -3, -7]
+PAGE_SIZE = int(os.environ.get("NOTIFY_PAGE_SIZE", "500"))
+# NOTIFY_DIGEST=0 falls back to one email per vaccination.
+DIGEST_MODE = os.environ.get("NOTIFY_DIGEST", "1") != "0"
+# Only what the email renders; the date filter, the shard filter and paging happen in the database.
+# Reads vaccination_latest (sql/006), so a dose that has been superseded by a newer one is never
+# reminded about. `id` is the vaccination id (the send ledger key).
+DUE_TABLE = "vaccination_latest"
+DUE_COLUMNS = "id:vaccination_id, user_id, pet_name, vaccine_type, next_due_date, profiles!inner(email, full_name, secondary_email)"
+
+# --- DATA ---
+# buckets=None -> every profile; otherwise only profiles whose send_bucket is in this tick's shard.
+def fetch_due_pages(client, today, buckets=None, page_size=PAGE_SIZE):
+    due_dates = [str(today + timedelta(days=d)) for d in NOTIFY_DAYS]
+    last_id = None
+    while True:
+        query = client.table(DUE_TABLE).select(DUE_COLUMNS).in_("next_due_date", due_dates)
+        if buckets is not None: query = query.in_("profiles.send_bucket", buckets)
+        query = query.order("vaccination_id").limit(page_size)
+        if last_id is not None: query = query.gt("vaccination_id", last_id)
+        page = query.execute().data
+        yield page
+        if len(page) < page_size: break
+        last_id = page[-1]["id"]
+
+# This tick's slot plus earlier slots of the day that never finished cleanly (ledger.record_slots).
+def pending_slots(ledger, day, now=None):
+    slots = due_slots(now)
+    done = ledger.done_slots(day) if slots else set()
+    return [s for s in slots if s == slots[-1] or s not in done]
+
+def recipients(profile):
+    emails = [profile['email']]
+    sec_email = profile.get('secondary_email', '')
+    if sec_email and "@" in sec_email and sec_email != profile['email']: emails.append(sec_email)
+    return emails
+
+# --- PIPELINE ---
+# pages -> ledger filter -> (digest) grouping -> render -> dispatcher queue.
+# Shared by main() and benchmarks/bench_notifier.py; stage times and counters go into `stats`.
+def run(pages, today, ledger, renderer, dispatcher, digest=DIGEST_MODE, verbose=True, stats=None):
+    stats = stats or RunStats()
+    for name in ("rows_scanned", "rows_matched", "rows_skipped_error", "already_sent", "rendered", "db_errors"): stats.count(name, 0)
+    digests = {}  # (user_id, email) -> {"name": ..., "items": [...], "keys": [...]}
+
+    def deliver(to_email, items, name, keys):
+        if verbose: print(f"🚀 Queueing email to {to_email}...")
+        with stats.stage("render"):
+            rendered = renderer.render(name, items)
+            msg = renderer.message(rendered, to_email)
+        stats.count("rendered")
+        # tag = (subject, ledger keys covered by the message); keys are only logged once the send succeeded.
+        with stats.stage("queue_wait"):
+            dispatcher.submit(to_email, msg, tag=(rendered[0], keys))
+
     try:
-        with smtplib.SMTP_SSL('smtp.gmail.com', 465) as s:
-            s.login(SMTP_USER, SMTP_PASS)
-            s.sendmail(SMTP_USER, to_email, msg.as_string())
-            print(f"✅ Sent email to {to_email}")
-        time.sleep(1)
+        pages = iter(pages)
+        while True:
+            with stats.stage("query"):
+                page = next(pages, None)
+            if page is None: break
+            with stats.stage("ledger_lookup"):
+                sent_keys = ledger.sent_keys([r['id'] for r in page])
+            for row in page:
+                stats.count("rows_scanned")
+                try:
+                    with stats.stage("parse"):
+                        due_str = row['next_due_date']
+                        due_date = datetime.strptime(due_str, "%Y-%m-%d").date()
+                        days_left = (due_date - today).days
+
+                    if days_left in NOTIFY_DAYS:
+                        if row.get('profiles') and row['profiles'].get('email'):
+                            stats.count("rows_matched")
+                            name = row['profiles'].get('full_name', '')
+                            item = (row['pet_name'], row['vaccine_type'], due_str, days_left)
+                            for email in recipients(row['profiles']):
+                                key = ledger_key(row['id'], due_str, days_left, email)
+                                if key in sent_keys:
+                                    stats.count("already_sent")
+                                    continue
+                                if digest:
+                                    entry = digests.setdefault((row['user_id'], email), {"name": name, "items": [], "keys": []})
+                                    entry["items"].append(item)
+                                    entry["keys"].append(key)
+                                else:
+                                    deliver(email, (item,), name, [key])
+                except Exception as e:
+                    stats.count("rows_skipped_error")
+                    print(f"⚠️ Skipping row due to error: {e}")
     except Exception as e:
-        print(f"❌ Error sending to {to_email}: {e}")
+        stats.count("db_errors")
+        print(f"❌ Database Error: {e}")
 
-# --- 4. CHECK VACCINES ---
-today = date.today()
-print(f"Checking vaccines for {today}...")
+    for (user_id, email), entry in digests.items():
+        deliver(email, tuple(entry["items"]), entry["name"], entry["keys"])
+    return stats
 
-try:
-    response = supabase.table("vaccinations").select("*, profiles(email, full_name, secondary_email)").execute()
-    rows = response.data
-except Exception as e:
-    print(f"❌ Database Error: {e}")
-    rows = []
+# The keep-alive ping lives in wakeup.py; this is the email job only.
+def main():
+    # --- 1. TIME CHECK ---
+    if not is_email_time():
+        print(f"💤 Outside the send window ({EMAIL_HOUR_UTC}:00 UTC + {SEND_WINDOW_HOURS}h). Going back to sleep.")
+        exit(0) # STOP HERE if no shard is due right now
 
-NOTIFY_DAYS = [7, 3, 1, 0, -3, -7]
-sent_count = 0
+    print(f"🔔 It is Email Time! Slot {due_slots()[-1]}, checking earlier slots that did not finish...")
 
-for row in rows:
+    # --- 2. DATABASE SETUP (Only runs inside the send window) ---
+    # Imported here so run() can be used without the Supabase SDK (see benchmarks/bench_notifier.py).
+    from supabase import create_client
     try:
-        due_str = row['next_due_date']
-        due_date = datetime.strptime(due_str, "%Y-%m-%d").date()
-        days_left = (due_date - today).days
-        
-        if days_left in NOTIFY_DAYS:
-            if row.get('profiles') and row['profiles'].get('email'):
-                email = row['profiles']['email']
-                name = row['profiles'].get('full_name', '')
-                sec_email = row['profiles'].get('secondary_email', '')
-                
-                send_alert(email, name, row['pet_name'], row['vaccine_type'], due_str, days_left)
-                sent_count += 1
-                
-                if sec_email and "@" in sec_email:
-                    send_alert(sec_email, name, row['pet_name'], row['vaccine_type'], due_str, days_left)
-                    sent_count += 1
-    except Exception as e:
-        print(f"⚠️ Skipping row due to error: {e}")
+        SUPA_URL = os.environ["SUPABASE_URL"]
+        SUPA_KEY = os.environ["SUPABASE_SERVICE_KEY"]
+        supabase = create_client(SUPA_URL, SUPA_KEY)
+
+        SMTP_USER = os.environ["EMAIL_USER"]
+        SMTP_PASS = os.environ["EMAIL_PASS"]
+    except KeyError as e:
+        print(f"❌ Missing Secret: {e}")
+        exit(1)
+
+    stats = RunStats()
+    today = send_day()
+    ledger = FileLedger(LEDGER_PATH) if LEDGER_PATH else SupabaseLedger(supabase)
+    slots = pending_slots(ledger, today)
+    stats.info.update({"send_day": str(today), "slots": slots, "digest": DIGEST_MODE, "workers": SMTP_WORKERS})
+
+    def record_sent(to_email, tag):
+        with stats.stage("ledger_record"): ledger.record(tag[1])
+
+    smtp_pool = SMTPPool(SMTP_USER, SMTP_PASS, size=SMTP_WORKERS, rate=SMTP_RATE_PER_SEC, burst=SMTP_BURST, stats=stats)
+    dispatcher = Dispatcher(smtp_pool, workers=SMTP_WORKERS, retries=SMTP_RETRIES, backoff=SMTP_BACKOFF_SEC, on_sent=record_sent, stats=stats)
+    renderer = Renderer(APP_URL, SMTP_USER)
+
+    # --- 3. CHECK VACCINES ---
+    buckets = buckets_for(slots)
+    print(f"Checking vaccines for {today} (slots {slots}, send buckets {buckets})...")
+    run(fetch_due_pages(supabase, today, buckets), today, ledger, renderer, dispatcher, stats=stats)
+
+    with stats.stage("delivery_drain"):
+        dispatcher.close()
+    smtp_pool.close()
+    stats.count("sent", dispatcher.sent)
+    stats.count("failed", len(dispatcher.failures))
+
+    if dispatcher.failures:
+        print(f"❌ Failed deliveries ({len(dispatcher.failures)}):")
+        for to, (subject, keys), e in dispatcher.failures:
+            print(f"   - {to} [{subject}]: {e}")
+    c = stats.counters
+    print(f"🏁 Done. Rows due: {c['rows_scanned']}. Already sent earlier: {c['already_sent']}. Total emails sent: {dispatcher.sent}")
+
+    if RUN_REPORT_PATH:
+        failures = [{"to": to, "subject": subject, "error": str(e), "transient": is_transient(e)} for to, (subject, keys), e in dispatcher.failures]
+        stats.write(RUN_REPORT_PATH, failures=failures)
+        print(f"📊 Run report written to {RUN_REPORT_PATH}")
+
+    # Non-zero exit flags the run; its slots stay unrecorded, so the next tick in today's window retries them.
+    if c["db_errors"] or any(is_transient(e) for _, _, e in dispatcher.failures):
+        print("⚠️ Some reminders are still pending. The next tick in today's send window will retry them.")
+        exit(1)
+    try: ledger.record_slots(today, slots)
+    except Exception as e: print(f"⚠️ Could not record finished slots {slots}: {e}")
 
-print(f"🏁 Done. Total emails sent: {sent_count}")
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,227 @@
+import itertools
+import sqlite3
+import threading
+from datetime import datetime, timezone
+
+# --- LOCAL REPLICA ---
+# Optional offline-first copy of a signed-in user's rows (LOCAL_REPLICA_PATH, see data.py). sync()
+# makes one replica_delta() call (sql/008_updated_at.sql): per table, the rows whose updated_at is at
+# or past the local watermark plus the remote row count. A delete leaves no updated_at behind, so
+# when the counts differ after the delta the remote ids are listed and the missing rows dropped
+# (an extra request only after a delete). Page reads are indexed SQL against the local file instead
+# of a fresh download of every row.
+PAGE_SIZE = 1000
+
+# table -> (owner column, replicated columns)
+TABLES = {
+    "vaccinations": ("user_id", ["id", "user_id", "pet_name", "vaccine_type", "date_applied", "next_due_date", "weight", "notes", "updated_at"]),
+    "pet_photos": ("user_id", ["id", "user_id", "pet_name", "photo_url", "thumb_url", "created_at", "updated_at"]),
+    "profiles": ("id", ["id", "email", "full_name", "secondary_email", "updated_at"]),
+}
+
+SCHEMA = """
+create table if not exists vaccinations (
+    id integer primary key, user_id text not null, pet_name text, vaccine_type text,
+    date_applied text, next_due_date text, weight real, notes text, updated_at text);
+create index if not exists vaccinations_user_pet on vaccinations (user_id, pet_name, date_applied);
+create index if not exists vaccinations_user_latest on vaccinations (user_id, pet_name, vaccine_type, date_applied desc, id desc);
+create table if not exists pet_photos (
+    id integer primary key, user_id text not null, pet_name text, photo_url text, thumb_url text,
+    created_at text, updated_at text);
+create index if not exists pet_photos_user on pet_photos (user_id, created_at);
+create table if not exists profiles (id text primary key, email text, full_name text, secondary_email text, updated_at text);
+create table if not exists sync_state (tbl text not null, user_id text not null, watermark text, primary key (tbl, user_id));
+"""
+
+# Same rule as vaccination_latest (sql/006): newest date_applied wins, then the newest id.
+LATEST_SQL = """
+select {cols} from (
+    select *, row_number() over (partition by pet_name, vaccine_type order by date_applied desc, id desc) as rn
+    from vaccinations where user_id = ?
+) where rn = 1 order by next_due_date
+"""
+
+class Replica:
+    def __init__(self, path):
+        self.db = sqlite3.connect(path, check_same_thread=False)
+        self.db.row_factory = sqlite3.Row
+        self.lock = threading.Lock()
+        with self.lock: self.db.executescript(SCHEMA)
+
+    def _query(self, sql, args=()):
+        with self.lock: return [dict(r) for r in self.db.execute(sql, args)]
+
+    def watermark(self, table, user_id):
+        rows = self._query("select watermark from sync_state where tbl = ? and user_id = ?", (table, user_id))
+        return rows[0]["watermark"] if rows else None
+
+    def synced(self, user_id):
+        return bool(self._query("select 1 from sync_state where user_id = ? limit 1", (user_id,)))
+
+    # --- SYNC ---
+    def _remote_ids(self, client, table, owner, user_id):
+        ids, last_id = set(), None
+        while True:
+            query = client.table(table).select("id").eq(owner, user_id).order("id").limit(PAGE_SIZE)
+            if last_id is not None: query = query.gt("id", last_id)
+            page = query.execute().data
+            ids.update(r["id"] for r in page)
+            if len(page) < PAGE_SIZE: return ids
+            last_id = page[-1]["id"]
+
+    # Returns {table: rows pulled or dropped}.
+    def sync(self, client, user_id):
+        since = {table: self.watermark(table, user_id) for table in TABLES}
+        delta = client.rpc("replica_delta", {"p_since": since}).execute().data
+        pulled = {}
+        for table, (owner, columns) in TABLES.items():
+            rows, watermark = delta[table]["rows"], since[table]
+            if rows:
+                # >=: rows sharing the watermark's timestamp come back again, the upsert is idempotent
+                with self.lock, self.db:
+                    self.db.executemany(f"insert or replace into {table} ({', '.join(columns)}) values ({', '.join('?' * len(columns))})",
+                                        [tuple(r.get(c) for c in columns) for r in rows])
+                watermark = max(watermark or "", max(r["updated_at"] for r in rows))
+            n = len(rows)
+            # Every remote insert/update is local now, so extra local rows can only be remote deletes.
+            local = self._query(f"select count(*) as n from {table} where {owner} = ?", (user_id,))[0]["n"]
+            if since[table] is not None and local != delta[table]["count"]:
+                gone = {r["id"] for r in self._query(f"select id from {table} where {owner} = ?", (user_id,))} - self._remote_ids(client, table, owner, user_id)
+                if gone:
+                    with self.lock, self.db: self.db.executemany(f"delete from {table} where id = ?", [(i,) for i in gone])
+                n += len(gone)
+            with self.lock, self.db:
+                self.db.execute("insert or replace into sync_state (tbl, user_id, watermark) values (?, ?, ?)", (table, user_id, watermark))
+            pulled[table] = n
+        return pulled
+
+    # --- READS ---
+    def profile(self, user_id, columns):
+        rows = self._query(f"select {', '.join(columns)} from profiles where id = ?", (user_id,))
+        return rows[0] if rows else None
+
+    def vaccinations(self, user_id, columns):
+        return self._query(f"select {', '.join(columns)} from vaccinations where user_id = ? order by date_applied, id", (user_id,))
+
+    def latest(self, user_id, columns):
+        return self._query(LATEST_SQL.format(cols=", ".join(columns)), (user_id,))
+
+    def history(self, user_id, pet_name, columns):
+        return self._query(f"select {', '.join(columns)} from vaccinations where user_id = ? and pet_name = ? order by date_applied, id", (user_id, pet_name))
+
+    def photos(self, user_id, columns):
+        return self._query(f"select {', '.join(columns)} from pet_photos where user_id = ? order by created_at desc", (user_id,))
+
+# --- LOCAL CLIENT ---
+# In-process stand-in for the Supabase client: the subset of the PostgREST query builder this app
+# uses, over plain dict rows, plus the get_bootstrap() and replica_delta() RPCs. Inserts get an id,
+# inserts and updates get updated_at (like the sql/008 triggers), so the replica can be synced and
+# tested without network. user_id plays auth.uid() for the RPCs. No embedded joins.
+class _Result:
+    def __init__(self, data, count=None): self.data, self.count = data, count
+
+class _Query:
+    def __init__(self, client, table):
+        self.client, self.table, self.filters, self.op, self.payload = client, table, [], "select", None
+        self.columns, self.sort, self.window, self.count, self.head = None, [], None, None, False
+
+    def select(self, columns="*", count=None, head=False):
+        self.op = "select"; self.columns = None if columns.strip() == "*" else [c.strip() for c in columns.split(",")]
+        self.count, self.head = count, head
+        return self
+
+    def _filter(self, fn): self.filters.append(fn); return self
+    def eq(self, col, value): return self._filter(lambda r: r.get(col) == value)
+    def neq(self, col, value): return self._filter(lambda r: r.get(col) != value)
+    def gt(self, col, value): return self._filter(lambda r: r.get(col) is not None and r[col] > value)
+    def gte(self, col, value): return self._filter(lambda r: r.get(col) is not None and r[col] >= value)
+    def lt(self, col, value): return self._filter(lambda r: r.get(col) is not None and r[col] < value)
+    def lte(self, col, value): return self._filter(lambda r: r.get(col) is not None and r[col] <= value)
+    def in_(self, col, values): values = list(values); return self._filter(lambda r: r.get(col) in values)
+    def is_(self, col, value): return self._filter(lambda r: r.get(col) is None if value in (None, "null") else r.get(col) == value)
+
+    def order(self, col, desc=False): self.sort.append((col, desc)); return self
+    def limit(self, n): self.window = (0, n); return self
+    def range(self, start, end): self.window = (start, end - start + 1); return self
+
+    def insert(self, rows, **kwargs): self.op, self.payload = "insert", rows; return self
+    def upsert(self, rows, **kwargs): self.op, self.payload = "upsert", rows; return self
+    def update(self, values): self.op, self.payload = "update", values; return self
+    def delete(self): self.op = "delete"; return self
+
+    def _match(self, row): return all(f(row) for f in self.filters)
+
+    def execute(self):
+        rows = self.client.tables.setdefault(self.table, [])
+        if self.op == "select":
+            out = [r for r in rows if self._match(r)]
+            for col, desc in reversed(self.sort): out.sort(key=lambda r: (r.get(col) is None, r.get(col) if r.get(col) is not None else 0), reverse=desc)
+            total = len(out) if self.count else None
+            if self.window: out = out[self.window[0]:self.window[0] + self.window[1]]
+            if self.head: return _Result([], total)
+            return _Result([{c: r.get(c) for c in self.columns} if self.columns else dict(r) for r in out], total)
+        if self.op in ("insert", "upsert"):
+            out = []
+            for new in (self.payload if isinstance(self.payload, list) else [self.payload]):
+                old = next((r for r in rows if new.get("id") is not None and r.get("id") == new["id"]), None) if self.op == "upsert" else None
+                if old is None:
+                    old = {"id": next(self.client.ids)}; rows.append(old)
+                old.update(new); old["updated_at"] = self.client.now(); out.append(dict(old))
+            return _Result(out)
+        hit = [r for r in rows if self._match(r)]
+        if self.op == "update":
+            for r in hit: r.update(self.payload); r["updated_at"] = self.client.now()
+        elif self.op == "delete":
+            self.client.tables[self.table] = [r for r in rows if not self._match(r)]
+        return _Result([dict(r) for r in hit])
+
+class _Call:
+    def __init__(self, fn, params): self.fn, self.params = fn, params or {}
+    def execute(self): return _Result(self.fn(**self.params))
+
+# get_bootstrap() projections (sql/007) and the replica_delta() tables (sql/008).
+BOOTSTRAP_PROFILE = ["id", "email", "full_name", "secondary_email"]
+BOOTSTRAP_VACCINATIONS = ["id", "pet_name", "vaccine_type", "date_applied", "next_due_date", "weight"]
+BOOTSTRAP_LATEST = ["id", "pet_name", "vaccine_type", "date_applied", "next_due_date"]
+BOOTSTRAP_PHOTOS = ["id", "pet_name", "photo_url", "thumb_url", "created_at"]
+
+class LocalClient:
+    def __init__(self, tables=None, user_id=None):
+        self.tables = tables if tables is not None else {}
+        self.user_id = user_id
+        self.ids = itertools.count(max((r.get("id") for rows in self.tables.values() for r in rows if isinstance(r.get("id"), int)), default=0) + 1)
+
+    def now(self):
+        return datetime.now(timezone.utc).isoformat()
+
+    def table(self, name):
+        return _Query(self, name)
+
+    def _own(self, table, owner="user_id"):
+        return [r for r in self.tables.get(table, []) if r.get(owner) == self.user_id]
+
+    def get_bootstrap(self):
+        pick = lambda rows, cols: [{c: r.get(c) for c in cols} for r in rows]
+        vax = self._own("vaccinations")
+        latest = {}
+        for r in sorted(vax, key=lambda r: (r.get("date_applied") or "", r["id"])):  # same rule as sql/006: newest date_applied, then id
+            latest[(r.get("pet_name"), r.get("vaccine_type"))] = r
+        profile = self._own("profiles", "id")
+        return {
+            "profile": pick(profile, BOOTSTRAP_PROFILE)[0] if profile else None,
+            "vaccinations": pick(sorted(vax, key=lambda r: r.get("date_applied") or ""), BOOTSTRAP_VACCINATIONS),
+            "latest": pick(sorted(latest.values(), key=lambda r: r.get("next_due_date") or ""), BOOTSTRAP_LATEST),
+            "photos": pick(sorted(self._own("pet_photos"), key=lambda r: r.get("created_at") or "", reverse=True), BOOTSTRAP_PHOTOS),
+        }
+
+    def replica_delta(self, p_since):
+        out = {}
+        for table, (owner, columns) in TABLES.items():
+            rows, since = self._own(table, owner), p_since.get(table)
+            fresh = sorted((r for r in rows if since is None or (r.get("updated_at") or "") >= since), key=lambda r: (r.get("updated_at") or "", str(r["id"])))
+            out[table] = {"rows": [{c: r.get(c) for c in columns} for r in fresh], "count": len(rows)}
+        return out
+
+    def rpc(self, name, params=None):
+        fn = {"get_bootstrap": self.get_bootstrap, "replica_delta": self.replica_delta}[name]
+        return _Call(fn, params)
@@ -0,0 +1,58 @@
+import json
+import threading
+import time
+from collections import defaultdict
+from contextlib import contextmanager
+from datetime import datetime
+
+# --- RUN STATS ---
+# Stage timers, counters and per-operation latency samples for one notifier run, written out as a
+# JSON report (RUN_REPORT_PATH, uploaded as a workflow artifact) so slow days can be compared.
+# Stage times are summed across threads, so for the SMTP stages they are busy time, not wall time.
+class RunStats:
+    def __init__(self):
+        self.started_at = datetime.utcnow()
+        self.t0 = time.perf_counter()
+        self.lock = threading.Lock()
+        self.stages = defaultdict(float)
+        self.counters = defaultdict(int)
+        self.latencies = defaultdict(list)
+        self.info = {}
+
+    @contextmanager
+    def stage(self, name):
+        t = time.perf_counter()
+        try:
+            yield
+        finally:
+            dt = time.perf_counter() - t
+            with self.lock: self.stages[name] += dt
+
+    def count(self, name, n=1):
+        with self.lock: self.counters[name] += n
+
+    def observe(self, op, seconds):
+        with self.lock: self.latencies[op].append(seconds)
+
+    def report(self):
+        def pct(sorted_vals, p):
+            return sorted_vals[min(len(sorted_vals) - 1, int(round(p / 100 * (len(sorted_vals) - 1))))]
+        ops = {}
+        for op, vals in self.latencies.items():
+            vals = sorted(vals)
+            ops[op] = {"count": len(vals), "total_sec": round(sum(vals), 4), "p50_ms": round(pct(vals, 50) * 1000, 2),
+                       "p90_ms": round(pct(vals, 90) * 1000, 2), "p99_ms": round(pct(vals, 99) * 1000, 2), "max_ms": round(vals[-1] * 1000, 2)}
+        return {
+            "started_at": self.started_at.isoformat() + "Z",
+            "duration_sec": round(time.perf_counter() - self.t0, 4),
+            **self.info,
+            "stages_sec": {k: round(v, 4) for k, v in self.stages.items()},
+            "counters": dict(self.counters),
+            "smtp_ops": ops,
+        }
+
+    def write(self, path, **extra):
+        data = {**self.report(), **extra}
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(data, f, indent=2, ensure_ascii=False, default=str)
+        return data
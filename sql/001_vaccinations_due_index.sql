@@ -0,0 +1,3 @@
+-- Notifier due-window lookup: next_due_date IN (...) ORDER BY id, paged by id.
+create index if not exists vaccinations_next_due_date_id_idx
+    on public.vaccinations (next_due_date, id);
@@ -0,0 +1,13 @@
+-- Send ledger for notifier.py: one row per delivered reminder.
+-- The primary key makes re-runs idempotent (upsert ... on conflict do nothing).
+create table if not exists public.notification_log (
+    vaccination_id bigint not null references public.vaccinations (id) on delete cascade,
+    due_date date not null,
+    notify_offset smallint not null,
+    recipient text not null,
+    sent_at timestamptz not null default now(),
+    primary key (vaccination_id, due_date, notify_offset, recipient)
+);
+
+-- Only the service key (notifier) touches this table.
+alter table public.notification_log enable row level security;
@@ -0,0 +1,14 @@
+-- Shard scheduler (wakeup.py): every profile gets a stable send bucket 0..95.
+-- A bucket is a position inside the daily send window, not a clock time: wakeup.buckets_for() sends
+-- bucket b in window slot b * SLOTS / 96 (12h window from 06:00 UTC: bucket 0 -> 06:00, 36 -> 10:30,
+-- 95 -> 17:45 UTC). preferred_bucket moves a user earlier or later in that window; otherwise the
+-- bucket is a hash of the id (kept in sync with wakeup.bucket_for()).
+alter table public.profiles
+    add column if not exists preferred_bucket smallint check (preferred_bucket between 0 and 95);
+
+alter table public.profiles
+    add column if not exists send_bucket smallint generated always as (
+        coalesce(preferred_bucket, ((('x' || substr(md5(id::text), 1, 8))::bit(32)::int & 2147483647) % 96)::smallint)
+    ) stored;
+
+create index if not exists profiles_send_bucket_idx on public.profiles (send_bucket);
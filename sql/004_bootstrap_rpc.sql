@@ -0,0 +1,27 @@
+-- Everything a logged-in page needs in one round trip (data.load_bootstrap).
+-- security invoker: the caller's RLS policies still apply.
+create or replace function public.get_bootstrap()
+returns json
+language sql
+stable
+security invoker
+as $$
+    select json_build_object(
+        'profile', (
+            select row_to_json(p)
+            from (select id, email, full_name, secondary_email from public.profiles where id = auth.uid()) p
+        ),
+        'vaccinations', coalesce((
+            select json_agg(v order by v.date_applied)
+            from public.vaccinations v
+            where v.user_id = auth.uid()
+        ), '[]'::json),
+        'photos', coalesce((
+            select json_agg(ph order by ph.created_at desc)
+            from public.pet_photos ph
+            where ph.user_id = auth.uid()
+        ), '[]'::json)
+    );
+$$;
+
+grant execute on function public.get_bootstrap() to authenticated;
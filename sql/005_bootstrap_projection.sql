@@ -0,0 +1,33 @@
+-- get_bootstrap() with per-view column projections (data.PROFILE_COLUMNS, PET_COLUMNS, PHOTO_COLUMNS).
+-- notes, created_at and user_id stay out of the page payload; the history editor reads them per pet.
+create or replace function public.get_bootstrap()
+returns json
+language sql
+stable
+security invoker
+as $$
+    select json_build_object(
+        'profile', (
+            select row_to_json(p)
+            from (select id, email, full_name, secondary_email from public.profiles where id = auth.uid()) p
+        ),
+        'vaccinations', coalesce((
+            select json_agg(v order by v.date_applied)
+            from (
+                select id, pet_name, vaccine_type, date_applied, next_due_date, weight
+                from public.vaccinations
+                where user_id = auth.uid()
+            ) v
+        ), '[]'::json),
+        'photos', coalesce((
+            select json_agg(ph order by ph.created_at desc)
+            from (
+                select id, pet_name, photo_url, created_at
+                from public.pet_photos
+                where user_id = auth.uid()
+            ) ph
+        ), '[]'::json)
+    );
+$$;
+
+grant execute on function public.get_bootstrap() to authenticated;
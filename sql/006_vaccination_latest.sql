@@ -0,0 +1,121 @@
+-- Latest dose per (user, pet, vaccine): the row the dashboard and the notifier care about.
+-- Kept up to date by a trigger on vaccinations, so nobody recomputes "latest" on read and
+-- superseded doses never reach the due-window query.
+create table if not exists public.vaccination_latest (
+    user_id uuid not null references public.profiles (id) on delete cascade,
+    pet_name text not null,
+    vaccine_type text not null,
+    vaccination_id bigint not null references public.vaccinations (id) on delete cascade,
+    date_applied date,
+    next_due_date date,
+    primary key (user_id, pet_name, vaccine_type)
+);
+
+-- Notifier due-window lookup: next_due_date IN (...) ORDER BY vaccination_id, paged by vaccination_id.
+create index if not exists vaccination_latest_due_idx
+    on public.vaccination_latest (next_due_date, vaccination_id);
+
+-- The notifier no longer reads vaccinations by due date, so sql/001's index only slows down writes.
+drop index if exists public.vaccinations_next_due_date_id_idx;
+
+alter table public.vaccination_latest enable row level security;
+drop policy if exists "own latest status" on public.vaccination_latest;
+create policy "own latest status" on public.vaccination_latest
+    for select using (user_id = auth.uid());
+
+-- refresh_vaccination_latest()'s lookup: one index probe per trigger call, so a 500-row bulk insert
+-- doesn't scan the key's whole history once per row. Same index as replica.py builds locally.
+create index if not exists vaccinations_user_latest_idx
+    on public.vaccinations (user_id, pet_name, vaccine_type, date_applied desc nulls last, id desc);
+
+-- Same ordering as the old client-side smart logic: newest date_applied wins, then the newest id.
+create or replace function public.refresh_vaccination_latest(p_user uuid, p_pet text, p_vaccine text)
+returns void
+language sql
+security definer
+set search_path = public
+as $$
+    delete from public.vaccination_latest
+    where user_id = p_user and pet_name = p_pet and vaccine_type = p_vaccine;
+
+    insert into public.vaccination_latest (user_id, pet_name, vaccine_type, vaccination_id, date_applied, next_due_date)
+    select user_id, pet_name, vaccine_type, id, date_applied, next_due_date
+    from public.vaccinations
+    where user_id = p_user and pet_name = p_pet and vaccine_type = p_vaccine
+    order by date_applied desc nulls last, id desc
+    limit 1;
+$$;
+
+-- Security definer: only the trigger may call it, not clients through /rpc/.
+revoke execute on function public.refresh_vaccination_latest(uuid, text, text) from public, anon, authenticated;
+
+-- Only the touched keys are recomputed (both of them when an edit renames the pet or vaccine).
+create or replace function public.vaccinations_latest_trigger()
+returns trigger
+language plpgsql
+security definer
+set search_path = public
+as $$
+begin
+    if tg_op in ('UPDATE', 'DELETE') then
+        perform public.refresh_vaccination_latest(old.user_id, old.pet_name, old.vaccine_type);
+    end if;
+    if tg_op in ('INSERT', 'UPDATE')
+       and (tg_op = 'INSERT' or (new.user_id, new.pet_name, new.vaccine_type) is distinct from (old.user_id, old.pet_name, old.vaccine_type)) then
+        perform public.refresh_vaccination_latest(new.user_id, new.pet_name, new.vaccine_type);
+    end if;
+    return null;
+end;
+$$;
+
+drop trigger if exists vaccinations_latest on public.vaccinations;
+create trigger vaccinations_latest
+    after insert or update or delete on public.vaccinations
+    for each row execute function public.vaccinations_latest_trigger();
+
+-- Backfill.
+insert into public.vaccination_latest (user_id, pet_name, vaccine_type, vaccination_id, date_applied, next_due_date)
+select distinct on (user_id, pet_name, vaccine_type)
+    user_id, pet_name, vaccine_type, id, date_applied, next_due_date
+from public.vaccinations
+order by user_id, pet_name, vaccine_type, date_applied desc nulls last, id desc
+on conflict (user_id, pet_name, vaccine_type) do nothing;
+
+-- get_bootstrap() also returns the latest status rows for the Home dashboard.
+create or replace function public.get_bootstrap()
+returns json
+language sql
+stable
+security invoker
+as $$
+    select json_build_object(
+        'profile', (
+            select row_to_json(p)
+            from (select id, email, full_name, secondary_email from public.profiles where id = auth.uid()) p
+        ),
+        'vaccinations', coalesce((
+            select json_agg(v order by v.date_applied)
+            from (
+                select id, pet_name, vaccine_type, date_applied, next_due_date, weight
+                from public.vaccinations
+                where user_id = auth.uid()
+            ) v
+        ), '[]'::json),
+        'latest', coalesce((
+            select json_agg(l order by l.next_due_date)
+            from (
+                select vaccination_id as id, pet_name, vaccine_type, date_applied, next_due_date
+                from public.vaccination_latest
+                where user_id = auth.uid()
+            ) l
+        ), '[]'::json),
+        'photos', coalesce((
+            select json_agg(ph order by ph.created_at desc)
+            from (
+                select id, pet_name, photo_url, created_at
+                from public.pet_photos
+                where user_id = auth.uid()
+            ) ph
+        ), '[]'::json)
+    );
+$$;
@@ -0,0 +1,44 @@
+-- Thumbnail next to every stored photo (images.prepare, uploaded under {user}/{pet}/thumbs/).
+-- Pages show thumb_url; photo_url is only loaded by the full-size view.
+-- Existing rows are filled in by backfill_thumbnails.py; until then the app falls back to photo_url.
+alter table public.pet_photos
+    add column if not exists thumb_url text;
+
+-- get_bootstrap() returns thumb_url with the photo metadata.
+create or replace function public.get_bootstrap()
+returns json
+language sql
+stable
+security invoker
+as $$
+    select json_build_object(
+        'profile', (
+            select row_to_json(p)
+            from (select id, email, full_name, secondary_email from public.profiles where id = auth.uid()) p
+        ),
+        'vaccinations', coalesce((
+            select json_agg(v order by v.date_applied)
+            from (
+                select id, pet_name, vaccine_type, date_applied, next_due_date, weight
+                from public.vaccinations
+                where user_id = auth.uid()
+            ) v
+        ), '[]'::json),
+        'latest', coalesce((
+            select json_agg(l order by l.next_due_date)
+            from (
+                select vaccination_id as id, pet_name, vaccine_type, date_applied, next_due_date
+                from public.vaccination_latest
+                where user_id = auth.uid()
+            ) l
+        ), '[]'::json),
+        'photos', coalesce((
+            select json_agg(ph order by ph.created_at desc)
+            from (
+                select id, pet_name, photo_url, thumb_url, created_at
+                from public.pet_photos
+                where user_id = auth.uid()
+            ) ph
+        ), '[]'::json)
+    );
+$$;
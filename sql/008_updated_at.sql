@@ -0,0 +1,81 @@
+-- Change watermark for the local SQLite replica (replica.py): every write bumps updated_at, and the
+-- app pulls only rows with updated_at >= its last sync. Deletes are reconciled by id.
+alter table public.vaccinations add column if not exists updated_at timestamptz not null default now();
+alter table public.pet_photos add column if not exists updated_at timestamptz not null default now();
+alter table public.profiles add column if not exists updated_at timestamptz not null default now();
+
+create or replace function public.touch_updated_at()
+returns trigger
+language plpgsql
+as $$
+begin
+    new.updated_at := now();
+    return new;
+end;
+$$;
+
+drop trigger if exists vaccinations_touch on public.vaccinations;
+create trigger vaccinations_touch before update on public.vaccinations
+    for each row execute function public.touch_updated_at();
+
+drop trigger if exists pet_photos_touch on public.pet_photos;
+create trigger pet_photos_touch before update on public.pet_photos
+    for each row execute function public.touch_updated_at();
+
+drop trigger if exists profiles_touch on public.profiles;
+create trigger profiles_touch before update on public.profiles
+    for each row execute function public.touch_updated_at();
+
+-- Delta pull: user_id = ? and updated_at >= ? order by updated_at, id.
+create index if not exists vaccinations_user_updated_idx on public.vaccinations (user_id, updated_at, id);
+create index if not exists pet_photos_user_updated_idx on public.pet_photos (user_id, updated_at, id);
+
+-- Replica sync in one round trip: for each replicated table, the caller's rows with updated_at at or
+-- past its watermark (all rows when the watermark is null) and the table's current row count, which
+-- replica.py compares with its local count to notice deletes.
+-- p_since: {"vaccinations": timestamptz | null, "pet_photos": ..., "profiles": ...}
+create or replace function public.replica_delta(p_since json)
+returns json
+language sql
+stable
+security invoker
+as $$
+    select json_build_object(
+        'vaccinations', json_build_object(
+            'rows', coalesce((
+                select json_agg(v order by v.updated_at, v.id)
+                from (
+                    select id, user_id, pet_name, vaccine_type, date_applied, next_due_date, weight, notes, updated_at
+                    from public.vaccinations
+                    where user_id = auth.uid()
+                      and (p_since->>'vaccinations' is null or updated_at >= (p_since->>'vaccinations')::timestamptz)
+                ) v
+            ), '[]'::json),
+            'count', (select count(*) from public.vaccinations where user_id = auth.uid())
+        ),
+        'pet_photos', json_build_object(
+            'rows', coalesce((
+                select json_agg(ph order by ph.updated_at, ph.id)
+                from (
+                    select id, user_id, pet_name, photo_url, thumb_url, created_at, updated_at
+                    from public.pet_photos
+                    where user_id = auth.uid()
+                      and (p_since->>'pet_photos' is null or updated_at >= (p_since->>'pet_photos')::timestamptz)
+                ) ph
+            ), '[]'::json),
+            'count', (select count(*) from public.pet_photos where user_id = auth.uid())
+        ),
+        'profiles', json_build_object(
+            'rows', coalesce((
+                select json_agg(p)
+                from (
+                    select id, email, full_name, secondary_email, updated_at
+                    from public.profiles
+                    where id = auth.uid()
+                      and (p_since->>'profiles' is null or updated_at >= (p_since->>'profiles')::timestamptz)
+                ) p
+            ), '[]'::json),
+            'count', (select count(*) from public.profiles where id = auth.uid())
+        )
+    );
+$$;
@@ -0,0 +1,39 @@
+-- Per-user iCalendar feed (ics_feed.py). The feed URL carries an unguessable token instead of the
+-- user id, and every change to a user's latest status rows stamps calendar_feed_changes, so the feed
+-- server re-reads only users whose due dates moved (one indexed query per refresh when nothing did).
+create extension if not exists pgcrypto;
+
+alter table public.profiles add column if not exists calendar_token text not null default encode(gen_random_bytes(18), 'hex');
+create unique index if not exists profiles_calendar_token_idx on public.profiles (calendar_token);
+
+create table if not exists public.calendar_feed_changes (
+    user_id uuid primary key references public.profiles (id) on delete cascade,
+    changed_at timestamptz not null default now()
+);
+
+-- Feed refresh: changed_at >= watermark.
+create index if not exists calendar_feed_changes_changed_idx on public.calendar_feed_changes (changed_at);
+
+-- Service key only: no policies.
+alter table public.calendar_feed_changes enable row level security;
+
+create or replace function public.calendar_feed_touch()
+returns trigger
+language plpgsql
+security definer
+set search_path = public
+as $$
+begin
+    insert into public.calendar_feed_changes (user_id, changed_at)
+    values (coalesce(new.user_id, old.user_id), now())
+    on conflict (user_id) do update set changed_at = excluded.changed_at;
+    return null;
+end;
+$$;
+
+-- vaccination_latest is rewritten by its own trigger (sql/006) on every vaccinations write, so this
+-- covers inserts, edits, renames and deletes of doses.
+drop trigger if exists vaccination_latest_feed on public.vaccination_latest;
+create trigger vaccination_latest_feed
+    after insert or update or delete on public.vaccination_latest
+    for each row execute function public.calendar_feed_touch();
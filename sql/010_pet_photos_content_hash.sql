@@ -0,0 +1,10 @@
+-- Content-addressed pet photos: content_hash is the hash of the normalized image (images.content_hash),
+-- and the objects live at {user}/{pet}/{content_hash}.jpg. One row per picture per pet, so a repeated
+-- upload is recognised by this lookup before anything is encoded or written to storage.
+-- Rows from before this migration keep a null hash (nulls never conflict) and are not deduplicated.
+alter table public.pet_photos
+    add column if not exists content_hash text;
+
+-- save_photo(): the duplicate lookup, and the on_conflict target of its insert.
+create unique index if not exists pet_photos_content_hash_idx
+    on public.pet_photos (user_id, pet_name, content_hash);
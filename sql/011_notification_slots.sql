@@ -0,0 +1,12 @@
+-- Finished send slots for notifier.py: one row per (send_day, slot) whose run had no database
+-- error and no transient delivery failure. Later ticks of the day only re-check earlier slots
+-- that have no row here, instead of every slot since the window opened.
+create table if not exists public.notification_slots (
+    send_day date not null,
+    slot smallint not null,
+    completed_at timestamptz not null default now(),
+    primary key (send_day, slot)
+);
+
+-- Only the service key (notifier) touches this table.
+alter table public.notification_slots enable row level security;
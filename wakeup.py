@@ -0,0 +1,93 @@
+# Keep-alive ping for the Streamlit app. Runs on every 15-minute cron tick, so it is stdlib-only:
+# no pip install and no heavy imports. It also owns the send schedule: the workflow reads
+# `email_time` from $GITHUB_OUTPUT to decide whether to install and run notifier.py, and locally
+# `python wakeup.py --notify` imports and runs the notifier in the same process.
+import hashlib
+import os
+import sys
+import urllib.request
+from datetime import datetime, timedelta
+
+# --- CONFIGURATION ---
+# GitHub Servers run in UTC.
+# 06:00 UTC = 09:00 TRT (Turkey Time): the send window opens here every day.
+EMAIL_HOUR_UTC = 6
+APP_URL = os.environ.get("APP_URL", "https://paticheck.streamlit.app")
+
+# --- SHARD SCHEDULE ---
+# Every profile has a stable send bucket 0..95 (profiles.send_bucket: preferred_bucket if set,
+# otherwise a hash of the id). A bucket is a position inside the send window, not a clock time:
+# the window is cut into SLOTS 15-minute slots and bucket b is sent in slot b * SLOTS // 96, i.e. at
+# EMAIL_HOUR_UTC + (b * SLOTS // 96) * 15 min (12h window: bucket 0 -> 06:00 UTC, 36 -> 10:30 UTC,
+# 95 -> 17:45 UTC). This spreads the daily volume over SEND_WINDOW_HOURS instead of hitting SMTP in
+# one hour. 24 -> all 96 ticks of the day, and then bucket b is the b-th quarter hour after EMAIL_HOUR_UTC.
+SLOT_MINUTES = 15
+BUCKETS = 96
+SEND_WINDOW_HOURS = int(os.environ.get("SEND_WINDOW_HOURS", "12"))
+SLOTS = SEND_WINDOW_HOURS * 60 // SLOT_MINUTES
+
+def window_start(now=None):
+    now = now or datetime.utcnow()
+    start = now.replace(hour=EMAIL_HOUR_UTC, minute=0, second=0, microsecond=0)
+    if start > now: start -= timedelta(days=1)
+    return start
+
+# The day reminders are computed for; stays the same for the whole window, even past midnight UTC.
+def send_day(now=None):
+    return window_start(now).date()
+
+def current_slot(now=None):
+    now = now or datetime.utcnow()
+    return int((now - window_start(now)).total_seconds() // (SLOT_MINUTES * 60))
+
+# Every slot of the window up to now, not just the current one: however long cron was delayed or
+# skipped, the next tick can still send what is missing for the day. The notifier narrows this to
+# the current slot plus earlier ones without a completion record (ledger.done_slots).
+def due_slots(now=None):
+    slot = current_slot(now)
+    return list(range(slot + 1)) if slot < SLOTS else []
+
+# slot -> buckets sent in it (the inverse of b * SLOTS // BUCKETS).
+def buckets_for(slots):
+    slots = set(slots)
+    return [b for b in range(BUCKETS) if b * SLOTS // BUCKETS in slots]
+
+# Same expression as the send_bucket column in sql/003_profile_send_bucket.sql.
+def bucket_for(profile_id):
+    return (int(hashlib.md5(str(profile_id).encode()).hexdigest()[:8], 16) & 0x7FFFFFFF) % BUCKETS
+
+def is_email_time(now=None):
+    return bool(due_slots(now))
+
+def ping(url=APP_URL, timeout=10):
+    req = urllib.request.Request(url, headers={"User-Agent": "PatiCheck-wakeup"})
+    with urllib.request.urlopen(req, timeout=timeout) as res:
+        return res.status
+
+def main():
+    # --- 1. WAKE UP CALL (ALWAYS RUNS) ---
+    print(f"⏰ Tick Tock... It is {datetime.utcnow().strftime('%H:%M')} UTC.")
+    print(f"Pinging {APP_URL}...")
+    try:
+        ping()
+        print("✅ Ping success. App is awake.")
+    except Exception as e:
+        print(f"⚠️ Ping failed: {e}")
+
+    # --- 2. TIME CHECK ---
+    email_time = is_email_time()
+    if os.environ.get("GITHUB_OUTPUT"):
+        with open(os.environ["GITHUB_OUTPUT"], "a") as f:
+            f.write(f"email_time={'true' if email_time else 'false'}\n")
+    if not email_time:
+        print(f"💤 Outside the send window ({EMAIL_HOUR_UTC}:00 UTC + {SEND_WINDOW_HOURS}h). Going back to sleep.")
+        return
+
+    if "--notify" in sys.argv:
+        import notifier
+        notifier.main()
+    else:
+        print(f"🔔 It is Email Time! Slot {current_slot()}/{SLOTS}, handing over to notifier.py.")
+
+if __name__ == "__main__":
+    main()